@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from physics_studio.core.determinism.hashing import HASH_ALGORITHMS, hash_state
+
+
+def _legacy_hash_state(step_index: int, positions: np.ndarray, velocities: np.ndarray) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(step_index.to_bytes(8, byteorder="little", signed=False))
+    hasher.update(positions.astype(np.float64).tobytes(order="C"))
+    hasher.update(velocities.astype(np.float64).tobytes(order="C"))
+    return hasher.hexdigest()
+
+
+def _time_per_call(func, repeats: int) -> float:
+    start = time.perf_counter()
+    for step_index in range(repeats):
+        func(step_index)
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-step snapshot hashing cost by body count")
+    parser.add_argument("--bodies", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'bodies':>9} {'variant':>14} {'ms/step':>10} {'MB/s':>10}")
+    for count in args.bodies:
+        positions = rng.standard_normal((count, 3))
+        velocities = rng.standard_normal((count, 3))
+        megabytes = (positions.nbytes + velocities.nbytes) / 1e6
+        variants = [
+            (
+                "legacy-sha256",
+                lambda i, p=positions, v=velocities: _legacy_hash_state(i, p, v),
+            )
+        ]
+        for algorithm in HASH_ALGORITHMS:
+            variants.append(
+                (
+                    algorithm,
+                    lambda i, p=positions, v=velocities, a=algorithm: hash_state(i, p, v, a),
+                )
+            )
+        for name, func in variants:
+            seconds = _time_per_call(func, args.repeats)
+            print(f"{count:>9} {name:>14} {seconds * 1e3:>10.3f} {megabytes / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from physics_studio.core.run.simulator import run_simulation
+from physics_studio.render.sampling import INTERPOLATION_METHODS, sample_trajectory_many
+from physics_studio.scenario.io import load_scenario
+
+DEFAULT_SCENARIO = (
+    Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare interpolation error against storage for sparse recordings"
+    )
+    parser.add_argument("scenario", nargs="?", default=str(DEFAULT_SCENARIO))
+    parser.add_argument("--fps", type=int, default=60, help="Playback frames per second")
+    parser.add_argument("--sample-every", type=int, nargs="+", default=[1, 2, 5, 10, 25, 50])
+    args = parser.parse_args()
+
+    scenario = load_scenario(Path(args.scenario))
+    settings = scenario.settings
+    reference = run_simulation(
+        scenario.to_system_state(), scenario.events, settings.to_simulation_config()
+    ).trajectory
+    ref_times, ref_positions, _ = reference.as_arrays()
+    extent = float(np.ptp(ref_positions.reshape(-1, 3), axis=0).max()) or 1.0
+
+    print(f"scenario: {args.scenario}")
+    print(f"reference samples: {len(ref_times)}, extent: {extent:.6g}")
+    print(
+        f"{'every':>6} {'samples':>8} {'bytes':>10} {'method':>8} "
+        f"{'max_err':>12} {'rms_err':>12} {'rel_max':>10} {'us/frame':>9}"
+    )
+    for sample_every in args.sample_every:
+        config = settings.to_simulation_config(sample_every=sample_every)
+        sparse = run_simulation(scenario.to_system_state(), scenario.events, config).trajectory
+        _, positions, velocities = sparse.as_arrays()
+        stored_bytes = positions.nbytes + velocities.nbytes + len(sparse.times) * 8
+        for method in INTERPOLATION_METHODS:
+            sampled = sample_trajectory_many(sparse, ref_times, method=method)
+            error = np.linalg.norm(sampled - ref_positions, axis=2)
+            max_err = float(error.max())
+            rms_err = float(np.sqrt(np.mean(error**2)))
+
+            frame_times = np.arange(0.0, ref_times[-1], 1.0 / args.fps)
+            start = time.perf_counter()
+            sample_trajectory_many(sparse, frame_times, method=method)
+            elapsed = time.perf_counter() - start
+            per_frame_us = elapsed / max(frame_times.size, 1) * 1e6
+
+            print(
+                f"{sample_every:>6} {len(sparse.times):>8} {stored_bytes:>10} {method:>8} "
+                f"{max_err:>12.6g} {rms_err:>12.6g} {max_err / extent:>10.2e} "
+                f"{per_frame_us:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from physics_studio.render.presets import PRESETS
+from physics_studio.render.renderer import (
+    RENDER_MODES,
+    RenderBody,
+    RenderOptions,
+    render_density_frame,
+    render_frame,
+)
+from physics_studio.scenario.models import CameraState
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Software renderer frame cost")
+    parser.add_argument("--preset", choices=sorted(PRESETS.keys()), default="4k30")
+    parser.add_argument("--bodies", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--labels", action="store_true", help="Draw body labels")
+    parser.add_argument("--mode", choices=RENDER_MODES, default="bodies")
+    args = parser.parse_args()
+
+    preset = PRESETS[args.preset]
+    options = RenderOptions(
+        width=preset.width,
+        height=preset.height,
+        show_timecode=True,
+        show_labels=args.labels,
+        mode=args.mode,
+    )
+    camera = CameraState(position=(0.0, 0.0, 50.0), target=(0.0, 0.0, 0.0), fov_deg=60.0)
+    rng = np.random.default_rng(0)
+    print(
+        f"preset {preset.name} ({preset.width}x{preset.height}), "
+        f"mode={args.mode}, labels={args.labels}"
+    )
+    print(f"{'bodies':>8} {'ms/frame':>10}")
+    for count in args.bodies:
+        positions = rng.uniform(-25.0, 25.0, size=(count, 3))
+        if args.mode == "density":
+            start = time.perf_counter()
+            for frame_index in range(args.frames):
+                render_density_frame(positions, camera, options, time_s=frame_index / preset.fps)
+            elapsed = (time.perf_counter() - start) / args.frames
+            print(f"{count:>8} {elapsed * 1e3:>10.2f}")
+            continue
+        bodies = [
+            RenderBody(id=f"body_{index}", position=tuple(position), radius_px=4 + index % 3)
+            for index, position in enumerate(positions.tolist())
+        ]
+        start = time.perf_counter()
+        for frame_index in range(args.frames):
+            render_frame(bodies, camera, options, time_s=frame_index / preset.fps)
+        elapsed = (time.perf_counter() - start) / args.frames
+        print(f"{count:>8} {elapsed * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from physics_studio.render.presets import PRESETS
+from physics_studio.render.yuv import Yuv420Converter, frame_shape
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RGB to yuv420p conversion cost per preset")
+    parser.add_argument("--frames", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'preset':>10} {'ms/frame':>10} {'rgb MB/s':>10} {'yuv MB/s':>10} {'saved':>7}")
+    for name in sorted(PRESETS):
+        preset = PRESETS[name]
+        rgb = rng.integers(0, 256, size=(preset.height, preset.width, 3), dtype=np.uint8)
+        converter = Yuv420Converter(preset.width, preset.height)
+        out = np.empty(frame_shape("yuv420p", preset.width, preset.height), dtype=np.uint8)
+        converter.convert(rgb, out)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            converter.convert(rgb, out)
+        elapsed = (time.perf_counter() - start) / args.frames
+        rgb_rate = rgb.nbytes * preset.fps / 1e6
+        yuv_rate = out.nbytes * preset.fps / 1e6
+        print(
+            f"{name:>10} {elapsed * 1e3:>10.2f} {rgb_rate:>10.1f} {yuv_rate:>10.1f} "
+            f"{1.0 - yuv_rate / rgb_rate:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import argparse
 import tempfile
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from physics_studio.authoring.commands import (
@@ -16,15 +19,16 @@ from physics_studio.authoring.commands import (
 )
 from physics_studio.authoring.validation import validate_scenario
 from physics_studio.core.run.simulator import run_simulation
-from physics_studio.render.sampling import sample_index
-from physics_studio.render.export import RenderJob, render_video
+from physics_studio.render.camera import compile_camera_track
+from physics_studio.render.sampling import PlaybackCursor
+from physics_studio.render.export import ExportCancelled, RenderJob, proxy_job, render_video
 from physics_studio.render.presets import PRESETS
 from physics_studio.scenario.io import load_scenario, save_scenario
 from physics_studio.scenario.models import CameraKeyframe, Particle, Scenario, ScenarioSettings
+from physics_studio.app.timeline import TimelinePreviewWidget
 from physics_studio.app.viewport import ViewportWidget
 from physics_studio.app.playback import (
     advance_playback_time,
-    select_preview_positions,
     should_run_simulation,
     status_label,
 )
@@ -44,8 +48,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self._preview_positions: dict[str, tuple[float, float, float]] = {}
         self._drag_start_positions: dict[str, tuple[float, float, float]] = {}
         self._trajectory = None
+        self._cursor: PlaybackCursor | None = None
         self._scrub_time_s = 0.0
-        self._scrub_positions: dict[str, tuple[float, float, float]] = {}
+        self._scrub_positions: np.ndarray | None = None
         self._keyframe_updating = False
         self._needs_simulation = True
         self._is_simulating = False
@@ -55,6 +60,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self._playback_speed = 0.25
         self._sim_thread: QtCore.QThread | None = None
         self._sim_worker: _SimulationWorker | None = None
+        self._export_thread: QtCore.QThread | None = None
+        self._export_worker: _ExportWorker | None = None
+        self._export_dialog: QtWidgets.QProgressDialog | None = None
+        self._close_after_export = False
         self._auto_play_on_sim_complete = False
 
         self._build_ui()
@@ -121,6 +130,9 @@ class MainWindow(QtWidgets.QMainWindow):
         layout = QtWidgets.QVBoxLayout(container)
         layout.addWidget(splitter)
 
+        self._timeline_preview = TimelinePreviewWidget()
+        layout.addWidget(self._timeline_preview)
+
         timeline_bar = QtWidgets.QWidget()
         timeline_layout = QtWidgets.QHBoxLayout(timeline_bar)
         self._timeline_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
@@ -168,10 +180,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self._run_sim_action = QtGui.QAction("Run Simulation", self)
         self._run_sim_action.triggered.connect(self._run_simulation)
 
-        export_action = QtGui.QAction("Export Video", self)
-        export_action.triggered.connect(self._export_video)
+        self._export_action = QtGui.QAction("Export Video", self)
+        self._export_action.triggered.connect(self._export_video)
 
-        file_menu.addAction(export_action)
+        file_menu.addAction(self._export_action)
         edit_menu.addAction(self._undo_action)
         edit_menu.addAction(self._redo_action)
         create_menu.addAction(add_body_action)
@@ -216,13 +228,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._sync_selection()
         self._refresh_keyframes(scenario)
         self._update_scrub_positions()
-        camera_state = scenario.camera_track.evaluate(self._scrub_time_s)
-        self._viewport.set_scene(
-            scenario,
-            self._selected_body_id,
-            self._compose_preview_positions(),
-            camera_state,
-        )
+        self._update_viewport()
         self._update_debug_panel()
 
     def _refresh_validation(self, scenario: Scenario) -> None:
@@ -248,13 +254,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._selected_body_id = item.data(QtCore.Qt.UserRole)
         else:
             self._selected_body_id = None
-        camera_state = self._manager.scenario.camera_track.evaluate(self._scrub_time_s)
-        self._viewport.set_scene(
-            self._manager.scenario,
-            self._selected_body_id,
-            self._compose_preview_positions(),
-            camera_state,
-        )
+        self._update_viewport()
 
     def _on_viewport_selected(self, body_id: str | None) -> None:
         self._selected_body_id = body_id
@@ -270,13 +270,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if start_pos:
             world_pos = (world_pos[0], world_pos[1], start_pos[2])
         self._preview_positions[body_id] = world_pos
-        camera_state = self._manager.scenario.camera_track.evaluate(self._scrub_time_s)
-        self._viewport.set_scene(
-            self._manager.scenario,
-            self._selected_body_id,
-            self._compose_preview_positions(),
-            camera_state,
-        )
+        self._update_viewport()
 
     def _on_drag_finished(self, body_id: str, world_pos: tuple[float, float, float]) -> None:
         start_pos = self._drag_start_positions.pop(body_id, None)
@@ -287,13 +281,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if start_pos != final_pos:
             self._manager.apply(MoveBody(body_id, final_pos))
         else:
-            camera_state = self._manager.scenario.camera_track.evaluate(self._scrub_time_s)
-            self._viewport.set_scene(
-                self._manager.scenario,
-                self._selected_body_id,
-                self._compose_preview_positions(),
-                camera_state,
-            )
+            self._update_viewport()
 
     def _find_body(self, body_id: str) -> Particle | None:
         for body in self._manager.scenario.particles + self._manager.scenario.rigid_bodies:
@@ -301,10 +289,36 @@ class MainWindow(QtWidgets.QMainWindow):
                 return body
         return None
 
-    def _compose_preview_positions(self) -> dict[str, tuple[float, float, float]]:
-        merged = dict(self._scrub_positions)
-        merged.update(self._preview_positions)
-        return merged
+    def _update_viewport(self) -> None:
+        scenario = self._manager.scenario
+        cameras = compile_camera_track(scenario.camera_track).evaluate_many(
+            np.array([self._scrub_time_s])
+        )
+        body_ids = self._cursor.body_ids if self._scrub_positions is not None else None
+        self._update_timeline_preview()
+        self._viewport.set_scene(
+            scenario,
+            self._selected_body_id,
+            self._preview_positions,
+            cameras.state(0),
+            body_ids=body_ids,
+            body_positions=self._scrub_positions,
+            camera_view=cameras.views[0],
+        )
+
+    def _update_timeline_preview(self) -> None:
+        lod = None
+        body_index = None
+        if self._trajectory is not None:
+            lod = self._trajectory.lod
+            body_ids = self._trajectory.body_ids
+            if self._selected_body_id in body_ids:
+                body_index = body_ids.index(self._selected_body_id)
+            elif body_ids:
+                body_index = 0
+        settings = self._manager.scenario.settings
+        self._timeline_preview.set_trajectory(lod, body_index, settings.dt * settings.steps)
+        self._timeline_preview.set_time(self._scrub_time_s)
 
     def _current_sample_every(self) -> int:
         sample_every = self._manager.scenario.metadata.get("sample_every", 1)
@@ -315,9 +329,9 @@ class MainWindow(QtWidgets.QMainWindow):
     def _update_debug_panel(self) -> None:
         dt = self._manager.scenario.settings.dt
         sample_every = self._current_sample_every()
-        num_samples = len(self._trajectory.times) if self._trajectory else 0
-        idx = sample_index(self._scrub_time_s, dt, sample_every, num_samples)
-        body_ids = self._trajectory.body_ids if self._trajectory else []
+        num_samples = self._cursor.num_samples if self._cursor else 0
+        idx = self._cursor.nearest_index() if self._cursor else 0
+        body_ids = self._cursor.body_ids if self._cursor else []
         body_id = self._selected_body_id or (body_ids[0] if body_ids else None)
         scenario_pos = None
         trajectory_pos = None
@@ -325,9 +339,9 @@ class MainWindow(QtWidgets.QMainWindow):
             body = self._find_body(body_id)
             if body:
                 scenario_pos = body.position
-            if self._trajectory and body_id in body_ids:
+            if self._scrub_positions is not None and body_id in body_ids:
                 body_index = body_ids.index(body_id)
-                trajectory_pos = tuple(self._trajectory.positions[idx][body_index])
+                trajectory_pos = tuple(self._scrub_positions[body_index].tolist())
         lines = [
             f"Status: {status_label(self._needs_simulation, self._is_simulating, self._playback_timer.isActive())}",
             f"time_s: {self._scrub_time_s:0.3f}",
@@ -364,7 +378,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self._keyframe_updating = False
 
     def _add_keyframe(self) -> None:
-        camera_state = self._manager.scenario.camera_track.evaluate(self._scrub_time_s)
+        camera_state = compile_camera_track(self._manager.scenario.camera_track).evaluate(
+            self._scrub_time_s
+        )
         keyframe = CameraKeyframe(
             time_s=self._scrub_time_s,
             position=camera_state.position,
@@ -414,11 +430,13 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         if not output_path:
             return
-        preset_name, ok = QtWidgets.QInputDialog.getItem(
-            self, "Render Preset", "Preset", list(PRESETS.keys()), 0, False
+        choices = list(PRESETS.keys()) + [f"{name} (proxy)" for name in PRESETS]
+        choice, ok = QtWidgets.QInputDialog.getItem(
+            self, "Render Preset", "Preset", choices, 0, False
         )
         if not ok:
             return
+        preset_name, proxy, _ = choice.partition(" (proxy)")
         preset = PRESETS[preset_name]
         duration_s, ok = QtWidgets.QInputDialog.getDouble(
             self,
@@ -446,7 +464,71 @@ class MainWindow(QtWidgets.QMainWindow):
             height=preset.height,
             bitrate=preset.bitrate,
         )
-        render_video(job)
+        if proxy:
+            job = proxy_job(job)
+        self._start_export(job)
+
+    def _start_export(self, job: RenderJob) -> None:
+        self._export_action.setEnabled(False)
+        dialog = QtWidgets.QProgressDialog(
+            f"Exporting {job.output_path.name}…", "Cancel", 0, 0, self
+        )
+        dialog.setWindowTitle("Export Video")
+        dialog.setWindowModality(QtCore.Qt.NonModal)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(0)
+        thread = QtCore.QThread(self)
+        worker = _ExportWorker(job)
+        worker.moveToThread(thread)
+        worker.progress.connect(self._on_export_progress)
+        worker.finished.connect(self._on_export_complete)
+        worker.finished.connect(thread.quit)
+        worker.cancelled.connect(thread.quit)
+        worker.error.connect(self._on_export_error)
+        worker.error.connect(thread.quit)
+        dialog.canceled.connect(worker.cancel, QtCore.Qt.DirectConnection)
+        thread.finished.connect(self._on_export_thread_finished)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.started.connect(worker.run)
+        self._export_thread = thread
+        self._export_worker = worker
+        self._export_dialog = dialog
+        dialog.show()
+        thread.start()
+
+    def _on_export_progress(self, done: int, total: int, eta_s: float) -> None:
+        if self._export_dialog is None:
+            return
+        self._export_dialog.setMaximum(total)
+        self._export_dialog.setValue(done)
+        self._export_dialog.setLabelText(f"Frame {done}/{total}, about {eta_s:0.0f}s remaining")
+
+    def _on_export_complete(self, output_path: str) -> None:
+        self.statusBar().showMessage(f"Exported {output_path}", 5000)
+
+    def _on_export_error(self, message: str) -> None:
+        QtWidgets.QMessageBox.warning(self, "Export Error", message)
+
+    def _on_export_thread_finished(self) -> None:
+        if self._export_dialog is not None:
+            self._export_dialog.close()
+        self._export_action.setEnabled(True)
+        self._export_thread = None
+        self._export_worker = None
+        self._export_dialog = None
+        if self._close_after_export:
+            self.close()
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        if self._export_worker is not None and self._export_thread is not None:
+            self._export_worker.cancel()
+            self._close_after_export = True
+            self.statusBar().showMessage("Cancelling export…")
+            event.ignore()
+            return
+        super().closeEvent(event)
 
     def _set_time(self, time_s: float, update_slider: bool = True) -> None:
         duration_s = self._manager.scenario.settings.dt * self._manager.scenario.settings.steps
@@ -461,13 +543,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 self._timeline_slider.setValue(value)
                 self._timeline_slider.blockSignals(False)
         self._update_scrub_positions()
-        camera_state = self._manager.scenario.camera_track.evaluate(self._scrub_time_s)
-        self._viewport.set_scene(
-            self._manager.scenario,
-            self._selected_body_id,
-            self._compose_preview_positions(),
-            camera_state,
-        )
+        self._update_viewport()
         self._update_debug_panel()
         self._update_status_label()
 
@@ -479,6 +555,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _invalidate_simulation(self) -> None:
         self._trajectory = None
+        self._cursor = None
+        self._scrub_positions = None
         self._needs_simulation = True
         self._is_simulating = False
         if self._playback_timer.isActive():
@@ -497,27 +575,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self._update_status_label()
 
     def _update_scrub_positions(self) -> None:
-        scenario_positions = {
-            body.id: body.position
-            for body in self._manager.scenario.particles + self._manager.scenario.rigid_bodies
-        }
-        trajectory_positions: dict[str, tuple[float, float, float]] = {}
-        if self._trajectory is not None:
-            sample_every = self._current_sample_every()
-            num_samples = len(self._trajectory.times)
-            idx = sample_index(
-                self._scrub_time_s, self._manager.scenario.settings.dt, sample_every, num_samples
-            )
-            positions = self._trajectory.positions[idx]
-            trajectory_positions = {
-                body_id: tuple(positions[index])
-                for index, body_id in enumerate(self._trajectory.body_ids)
-            }
-        self._scrub_positions = select_preview_positions(
-            self._trajectory is not None and not self._needs_simulation,
-            trajectory_positions,
-            scenario_positions,
-        )
+        self._scrub_positions = None
+        if self._cursor is not None and not self._needs_simulation:
+            self._scrub_positions = self._cursor.seek(self._scrub_time_s)
         self._update_debug_panel()
 
     def _toggle_playback(self) -> None:
@@ -554,7 +614,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._play_button.setText("Play")
         self._run_sim_action.setEnabled(False)
         thread = QtCore.QThread(self)
-        worker = _SimulationWorker(self._manager.scenario)
+        worker = _SimulationWorker(self._manager.scenario, self._current_sample_every())
         worker.moveToThread(thread)
         worker.finished.connect(self._on_simulation_complete)
         worker.finished.connect(thread.quit)
@@ -570,6 +630,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _on_simulation_complete(self, trajectory) -> None:
         self._trajectory = trajectory
+        self._cursor = PlaybackCursor(trajectory, method="nearest")
         self._needs_simulation = False
         self._is_simulating = False
         self._update_status_label()
@@ -604,13 +665,16 @@ class _SimulationWorker(QtCore.QObject):
     finished = QtCore.Signal(object)
     error = QtCore.Signal(str)
 
-    def __init__(self, scenario: Scenario) -> None:
+    def __init__(self, scenario: Scenario, sample_every: int = 1) -> None:
         super().__init__()
         self._scenario = scenario
+        self._sample_every = sample_every
 
     def run(self) -> None:
         try:
-            config = self._scenario.settings.to_simulation_config(record_hashes=False)
+            config = self._scenario.settings.to_simulation_config(
+                record_hashes=False, sample_every=self._sample_every
+            )
             trajectory = run_simulation(
                 self._scenario.to_system_state(), self._scenario.events, config
             ).trajectory
@@ -619,6 +683,36 @@ class _SimulationWorker(QtCore.QObject):
             self.error.emit(str(exc))
 
 
+class _ExportWorker(QtCore.QObject):
+    progress = QtCore.Signal(int, int, float)
+    finished = QtCore.Signal(str)
+    cancelled = QtCore.Signal()
+    error = QtCore.Signal(str)
+
+    def __init__(self, job: RenderJob) -> None:
+        super().__init__()
+        self._job = job
+        self._cancel = threading.Event()
+        self._started = 0.0
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def run(self) -> None:
+        self._started = time.monotonic()
+        try:
+            render_video(self._job, progress=self._report, cancel=self._cancel)
+            self.finished.emit(str(self._job.output_path))
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as exc:
+            self.error.emit(str(exc))
+
+    def _report(self, done: int, total: int) -> None:
+        elapsed = time.monotonic() - self._started
+        self.progress.emit(done, total, elapsed / done * (total - done))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Physics Simulation Studio GUI")
     parser.add_argument("scenario", nargs="?", help="Optional scenario JSON to load")
@@ -22,13 +22,3 @@ def status_label(needs_simulation: bool, is_simulating: bool, is_playing: bool)
     if needs_simulation:
         return "Needs simulation"
     return "Ready"
-
-
-def select_preview_positions(
-    has_trajectory: bool,
-    trajectory_positions: dict[str, tuple[float, float, float]],
-    scenario_positions: dict[str, tuple[float, float, float]],
-) -> dict[str, tuple[float, float, float]]:
-    if has_trajectory:
-        return trajectory_positions
-    return scenario_positions
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from physics_studio.core.run.lod import TrajectoryLod
+
+_AXIS_COLORS = ("#ef476f", "#06d6a0", "#4aa3ff")
+
+
+class TimelinePreviewWidget(QtWidgets.QWidget):
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setMinimumHeight(36)
+        self.setMaximumHeight(48)
+        self._lod: TrajectoryLod | None = None
+        self._body_index: int | None = None
+        self._time_s = 0.0
+        self._duration_s = 0.0
+
+    def set_trajectory(
+        self, lod: TrajectoryLod | None, body_index: int | None, duration_s: float
+    ) -> None:
+        self._lod = lod
+        self._body_index = body_index
+        self._duration_s = duration_s
+        self.update()
+
+    def set_time(self, time_s: float) -> None:
+        self._time_s = time_s
+        self.update()
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#151515"))
+        width = self.width()
+        height = self.height()
+        if self._lod is None or self._body_index is None or width <= 0:
+            return
+
+        level = self._lod.level_for_columns(width)
+        if level.num_windows == 0 or self._duration_s <= 0:
+            return
+        columns = np.clip(
+            (level.times / self._duration_s * (width - 1)).astype(np.int64), 0, width - 1
+        ).tolist()
+        mins = level.mins[:, self._body_index]
+        maxs = level.maxs[:, self._body_index]
+        for axis, color in enumerate(_AXIS_COLORS):
+            low = mins[:, axis]
+            high = maxs[:, axis]
+            span = float(high.max() - low.min()) or 1.0
+            top = ((1.0 - (high - low.min()) / span) * (height - 1)).tolist()
+            bottom = ((1.0 - (low - low.min()) / span) * (height - 1)).tolist()
+            painter.setPen(QtGui.QPen(QtGui.QColor(color), 1))
+            for x, y0, y1 in zip(columns, top, bottom, strict=True):
+                painter.drawLine(QtCore.QPointF(x, y0), QtCore.QPointF(x, y1))
+
+        playhead = self._time_s / self._duration_s * (width - 1)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#ffd166"), 1))
+        painter.drawLine(QtCore.QPointF(playhead, 0), QtCore.QPointF(playhead, height))
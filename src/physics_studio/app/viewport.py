@@ -1,23 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 import math
 
 from PySide6 import QtCore, QtGui, QtWidgets
 import numpy as np
 
 from physics_studio.app.picking import BodyPickData, pick_body_screen
+from physics_studio.render.camera import view_matrix
 from physics_studio.render.renderer import project_points
 from physics_studio.scenario.models import CameraState, Scenario
 
 
-@dataclass(frozen=True)
-class BodyRenderData:
-    id: str
-    position: tuple[float, float, float]
-    radius: float
-
-
 class ViewportWidget(QtWidgets.QWidget):
     body_selected = QtCore.Signal(object)
     drag_started = QtCore.Signal(object)
@@ -31,10 +24,14 @@ class ViewportWidget(QtWidgets.QWidget):
         self._selected_body_id: str | None = None
         self._preview_positions: dict[str, tuple[float, float, float]] = {}
         self._camera_state: CameraState | None = None
+        self._camera_view: np.ndarray | None = None
         self._dragging = False
         self._drag_body_id: str | None = None
         self._drag_start_world: tuple[float, float, float] | None = None
-        self._screen_positions: dict[str, QtCore.QPointF] = {}
+        self._body_ids: list[str] | None = None
+        self._body_positions: np.ndarray | None = None
+        self._screen_ids: list[str] = []
+        self._screen_xy = np.zeros((0, 2), dtype=np.float64)
         self._view_center = QtCore.QPointF(0.0, 0.0)
         self._view_scale = 1.0
 
@@ -44,11 +41,19 @@ class ViewportWidget(QtWidgets.QWidget):
         selected_body_id: str | None,
         preview_positions: dict[str, tuple[float, float, float]] | None = None,
         camera: CameraState | None = None,
+        body_ids: list[str] | None = None,
+        body_positions: np.ndarray | None = None,
+        camera_view: np.ndarray | None = None,
     ) -> None:
         self._scenario = scenario
         self._selected_body_id = selected_body_id
         self._preview_positions = preview_positions or {}
         self._camera_state = camera
+        if camera is not None and camera_view is None:
+            camera_view = view_matrix(camera)
+        self._camera_view = camera_view if camera is not None else None
+        self._body_ids = body_ids
+        self._body_positions = body_positions
         self.update()
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
@@ -58,44 +63,42 @@ class ViewportWidget(QtWidgets.QWidget):
         if not self._scenario:
             return
 
-        bodies = self._collect_bodies()
+        ids, positions = self._collect_positions()
         if self._camera_state:
-            positions = np.array([body.position for body in bodies], dtype=np.float64)
-            projected = project_points(
-                positions, self._camera_state, self.width(), self.height()
+            screen = project_points(
+                positions, self._camera_state, self.width(), self.height(), self._camera_view
             )
-            self._screen_positions = {
-                body.id: QtCore.QPointF(float(point[0]), float(point[1]))
-                for body, point in zip(bodies, projected)
-            }
         else:
-            self._compute_view(bodies)
-            self._screen_positions = {
-                body.id: self._world_to_screen(body.position) for body in bodies
-            }
-
-        for body in bodies:
-            screen_pos = self._screen_positions[body.id]
-            size = 6 if body.id != self._selected_body_id else 10
-            color = QtGui.QColor("#4aa3ff") if body.id != self._selected_body_id else QtGui.QColor("#ffd166")
-            painter.setBrush(color)
-            painter.setPen(QtGui.QPen(QtGui.QColor("#000000"), 1))
-            painter.drawEllipse(screen_pos, size, size)
-
-        if self._selected_body_id and self._selected_body_id in self._screen_positions:
-            center = self._screen_positions[self._selected_body_id]
+            screen = self._compute_view(positions)
+        self._screen_ids = ids
+        self._screen_xy = screen[:, :2]
+
+        painter.setPen(QtGui.QPen(QtGui.QColor("#000000"), 1))
+        painter.setBrush(QtGui.QColor("#4aa3ff"))
+        selected_index = None
+        for index, (x, y) in enumerate(self._screen_xy.tolist()):
+            if ids[index] == self._selected_body_id:
+                selected_index = index
+                continue
+            painter.drawEllipse(QtCore.QPointF(x, y), 6, 6)
+
+        if selected_index is not None:
+            center = QtCore.QPointF(*self._screen_xy[selected_index].tolist())
+            painter.setBrush(QtGui.QColor("#ffd166"))
+            painter.drawEllipse(center, 10, 10)
+            painter.setBrush(QtCore.Qt.NoBrush)
             painter.setPen(QtGui.QPen(QtGui.QColor("#ffd166"), 1, QtCore.Qt.DashLine))
             painter.drawEllipse(center, 16, 16)
 
     def mousePressEvent(self, event: QtGui.QMouseEvent) -> None:
         if not self._scenario or event.button() != QtCore.Qt.LeftButton:
             return
-        bodies = self._collect_bodies()
         screen_positions = {
-            body_id: (pos.x(), pos.y()) for body_id, pos in self._screen_positions.items()
+            body_id: (float(x), float(y))
+            for body_id, (x, y) in zip(self._screen_ids, self._screen_xy.tolist())
         }
         clicked_id = pick_body_screen(
-            [BodyPickData(id=body.id) for body in bodies],
+            [BodyPickData(id=body_id) for body_id in self._screen_ids],
             (event.position().x(), event.position().y()),
             screen_positions,
             threshold_px=12,
@@ -129,37 +132,44 @@ class ViewportWidget(QtWidgets.QWidget):
         self._drag_body_id = None
         self._drag_start_world = None
 
-    def _collect_bodies(self) -> list[BodyRenderData]:
-        bodies: list[BodyRenderData] = []
+    def _collect_positions(self) -> tuple[list[str], np.ndarray]:
         if not self._scenario:
-            return bodies
-        for body in self._scenario.particles + self._scenario.rigid_bodies:
-            position = self._preview_positions.get(body.id, body.position)
-            radius = getattr(body, "radius", 1.0)
-            bodies.append(BodyRenderData(id=body.id, position=position, radius=radius))
-        return bodies
-
-    def _compute_view(self, bodies: list[BodyRenderData]) -> None:
-        if not bodies:
+            return [], np.zeros((0, 3), dtype=np.float64)
+        if self._body_ids is not None and self._body_positions is not None:
+            ids = self._body_ids
+            positions = self._body_positions
+        else:
+            bodies = self._scenario.particles + self._scenario.rigid_bodies
+            ids = [body.id for body in bodies]
+            positions = np.array(
+                [body.position for body in bodies], dtype=np.float64
+            ).reshape(-1, 3)
+        if self._preview_positions:
+            positions = positions.copy()
+            for index, body_id in enumerate(ids):
+                if body_id in self._preview_positions:
+                    positions[index] = self._preview_positions[body_id]
+        return ids, positions
+
+    def _compute_view(self, positions: np.ndarray) -> np.ndarray:
+        if positions.shape[0] == 0:
             self._view_center = QtCore.QPointF(0.0, 0.0)
             self._view_scale = 1.0
-            return
-        min_x = min(body.position[0] for body in bodies)
-        max_x = max(body.position[0] for body in bodies)
-        min_y = min(body.position[1] for body in bodies)
-        max_y = max(body.position[1] for body in bodies)
-        width = max(max_x - min_x, 1.0)
-        height = max(max_y - min_y, 1.0)
+            return np.zeros((0, 3), dtype=np.float64)
+        mins = positions[:, :2].min(axis=0)
+        maxs = positions[:, :2].max(axis=0)
+        width = max(float(maxs[0] - mins[0]), 1.0)
+        height = max(float(maxs[1] - mins[1]), 1.0)
         padding = 40.0
-        self._view_center = QtCore.QPointF((min_x + max_x) / 2.0, (min_y + max_y) / 2.0)
+        center = (mins + maxs) / 2.0
+        self._view_center = QtCore.QPointF(float(center[0]), float(center[1]))
         scale_x = (self.width() - padding) / width
         scale_y = (self.height() - padding) / height
         self._view_scale = min(scale_x, scale_y)
-
-    def _world_to_screen(self, position: tuple[float, float, float]) -> QtCore.QPointF:
-        x = (position[0] - self._view_center.x()) * self._view_scale + self.width() / 2.0
-        y = (position[1] - self._view_center.y()) * self._view_scale + self.height() / 2.0
-        return QtCore.QPointF(x, y)
+        screen = np.zeros_like(positions)
+        screen[:, 0] = (positions[:, 0] - center[0]) * self._view_scale + self.width() / 2.0
+        screen[:, 1] = (positions[:, 1] - center[1]) * self._view_scale + self.height() / 2.0
+        return screen
 
     def _screen_to_world(self, point: QtCore.QPointF) -> tuple[float, float, float]:
         if self._camera_state:
@@ -182,22 +192,11 @@ class ViewportWidget(QtWidgets.QWidget):
         x_cam = x_ndc / scale
         y_cam = y_ndc / scale
         position = np.array(self._camera_state.position, dtype=np.float64)
-        target = np.array(self._camera_state.target, dtype=np.float64)
-        forward = target - position
-        norm = np.linalg.norm(forward)
-        if norm == 0.0:
-            forward = np.array([0.0, 0.0, -1.0], dtype=np.float64)
-        else:
-            forward = forward / norm
-        up_guess = np.array([0.0, 0.0, 1.0], dtype=np.float64)
-        right = np.cross(forward, up_guess)
-        right_norm = np.linalg.norm(right)
-        if right_norm == 0.0:
-            right = np.array([1.0, 0.0, 0.0], dtype=np.float64)
-        else:
-            right = right / right_norm
-        up = np.cross(right, forward)
-        direction = right * x_cam + up * y_cam - forward
+        view = self._camera_view
+        if view is None:
+            view = view_matrix(self._camera_state)
+        right, up, forward = view[0, :3], view[1, :3], -view[2, :3]
+        direction = right * x_cam + up * y_cam + forward
         dir_norm = np.linalg.norm(direction)
         if dir_norm == 0.0:
             return (float(position[0]), float(position[1]), 0.0)
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from physics_studio.scenario.io import TrajectoryFile, load_trajectory_file
+
+EXIT_OK = 0
+EXIT_TOLERANCE = 1
+EXIT_MISMATCH = 2
+
+
+@dataclass(frozen=True)
+class BodyError:
+    body_id: str
+    position_max: float
+    position_rms: float
+    velocity_max: float
+    velocity_rms: float
+
+
+@dataclass(frozen=True)
+class Exceedance:
+    sample_index: int
+    time_s: float
+    body_id: str
+    channel: str
+    error: float
+
+
+@dataclass
+class ComparisonReport:
+    num_samples: int
+    max_time_error: float
+    bodies: list[BodyError] = field(default_factory=list)
+    first_exceedance: Exceedance | None = None
+    mismatch: str | None = None
+
+    @property
+    def exit_code(self) -> int:
+        if self.mismatch is not None:
+            return EXIT_MISMATCH
+        if self.first_exceedance is not None:
+            return EXIT_TOLERANCE
+        return EXIT_OK
+
+    def to_dict(self) -> dict:
+        payload = {
+            "num_samples": self.num_samples,
+            "max_time_error": self.max_time_error,
+            "bodies": [body.__dict__ for body in self.bodies],
+            "first_exceedance": None,
+            "mismatch": self.mismatch,
+        }
+        if self.first_exceedance is not None:
+            payload["first_exceedance"] = self.first_exceedance.__dict__
+        return payload
+
+
+def compare_trajectories(
+    left: TrajectoryFile,
+    right: TrajectoryFile,
+    position_tolerance: float,
+    velocity_tolerance: float | None = None,
+    chunk_size: int = 4096,
+    time_tolerance: float = 0.0,
+) -> ComparisonReport:
+    if left.body_ids != right.body_ids:
+        return ComparisonReport(
+            num_samples=0,
+            max_time_error=0.0,
+            mismatch=f"Body ids differ: {left.body_ids} vs {right.body_ids}",
+        )
+    if left.num_samples != right.num_samples:
+        return ComparisonReport(
+            num_samples=0,
+            max_time_error=0.0,
+            mismatch=f"Sample counts differ: {left.num_samples} vs {right.num_samples}",
+        )
+
+    count = len(left.body_ids)
+    samples = left.num_samples
+    chunk_size = max(int(chunk_size), 1)
+    position_max = np.zeros(count, dtype=np.float64)
+    velocity_max = np.zeros(count, dtype=np.float64)
+    position_sq = np.zeros(count, dtype=np.float64)
+    velocity_sq = np.zeros(count, dtype=np.float64)
+    max_time_error = 0.0
+    time_mismatch: int | None = None
+    first: Exceedance | None = None
+
+    for start in range(0, samples, chunk_size):
+        stop = min(start + chunk_size, samples)
+        time_error = np.abs(left.times[start:stop] - right.times[start:stop])
+        max_time_error = float(np.max([max_time_error, time_error.max(initial=0.0)]))
+        late = ~(time_error <= time_tolerance)
+        if time_mismatch is None and late.any():
+            time_mismatch = start + int(np.argmax(late))
+        position_error = np.linalg.norm(
+            left.positions[start:stop] - right.positions[start:stop], axis=2
+        )
+        velocity_error = np.linalg.norm(
+            left.velocities[start:stop] - right.velocities[start:stop], axis=2
+        )
+        np.maximum(position_max, position_error.max(axis=0), out=position_max)
+        np.maximum(velocity_max, velocity_error.max(axis=0), out=velocity_max)
+        position_sq += np.square(position_error).sum(axis=0)
+        velocity_sq += np.square(velocity_error).sum(axis=0)
+
+        if first is None:
+            first = _first_exceedance(left, start, position_error, position_tolerance, "position")
+            if velocity_tolerance is not None:
+                velocity_first = _first_exceedance(
+                    left, start, velocity_error, velocity_tolerance, "velocity"
+                )
+                if velocity_first is not None and (
+                    first is None or velocity_first.sample_index < first.sample_index
+                ):
+                    first = velocity_first
+
+    divisor = max(samples, 1)
+    position_rms = np.sqrt(position_sq / divisor)
+    velocity_rms = np.sqrt(velocity_sq / divisor)
+    bodies = [
+        BodyError(
+            body_id=body_id,
+            position_max=float(position_max[index]),
+            position_rms=float(position_rms[index]),
+            velocity_max=float(velocity_max[index]),
+            velocity_rms=float(velocity_rms[index]),
+        )
+        for index, body_id in enumerate(left.body_ids)
+    ]
+    mismatch = None
+    if time_mismatch is not None:
+        mismatch = (
+            f"Sample times differ at sample {time_mismatch}: "
+            f"{left.times[time_mismatch]} vs {right.times[time_mismatch]}"
+        )
+    return ComparisonReport(
+        num_samples=samples,
+        max_time_error=max_time_error,
+        bodies=bodies,
+        first_exceedance=first,
+        mismatch=mismatch,
+    )
+
+
+def _first_exceedance(
+    trajectory: TrajectoryFile,
+    offset: int,
+    errors: np.ndarray,
+    tolerance: float,
+    channel: str,
+) -> Exceedance | None:
+    exceeded = ~(errors <= tolerance)
+    if not exceeded.any():
+        return None
+    flat = int(np.argmax(exceeded))
+    row, body_index = divmod(flat, errors.shape[1])
+    sample_index = offset + row
+    return Exceedance(
+        sample_index=sample_index,
+        time_s=float(trajectory.times[sample_index]),
+        body_id=trajectory.body_ids[body_index],
+        channel=channel,
+        error=float(errors[row, body_index]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare two trajectories within a tolerance. .trajbin inputs are "
+        "memory-mapped and compared in chunks; JSON inputs are loaded whole, so convert "
+        "large runs to .trajbin first."
+    )
+    parser.add_argument("expected", help="Reference trajectory (JSON or .trajbin)")
+    parser.add_argument("actual", help="Trajectory to check (JSON or .trajbin)")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.0, help="Maximum position error in meters"
+    )
+    parser.add_argument("--velocity-tolerance", type=float, help="Maximum velocity error in m/s")
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.0,
+        help="Maximum difference between sample times in seconds before the runs mismatch",
+    )
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Samples compared per chunk")
+    parser.add_argument("--report", help="Optional path for a JSON report")
+    args = parser.parse_args()
+
+    expected = load_trajectory_file(Path(args.expected))
+    actual = load_trajectory_file(Path(args.actual))
+    report = compare_trajectories(
+        expected,
+        actual,
+        position_tolerance=args.tolerance,
+        velocity_tolerance=args.velocity_tolerance,
+        chunk_size=args.chunk_size,
+        time_tolerance=args.time_tolerance,
+    )
+
+    if report.mismatch is not None:
+        print(f"Mismatch: {report.mismatch}")
+    else:
+        print(
+            f"Compared {report.num_samples} samples (max time error {report.max_time_error:.3e}s)"
+        )
+        print(f"{'body':<24} {'pos_max':>12} {'pos_rms':>12} {'vel_max':>12} {'vel_rms':>12}")
+        for body in report.bodies:
+            print(
+                f"{body.body_id:<24} {body.position_max:>12.4e} {body.position_rms:>12.4e} "
+                f"{body.velocity_max:>12.4e} {body.velocity_rms:>12.4e}"
+            )
+        first = report.first_exceedance
+        if first is None:
+            print("All samples within tolerance.")
+        else:
+            print(
+                f"First exceedance at sample {first.sample_index} (t={first.time_s:.6g}s): "
+                f"{first.body_id} {first.channel} error {first.error:.4e}"
+            )
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    sys.exit(report.exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,124 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from physics_studio.render.export import RenderJob, render_video
+from physics_studio.render.export import (
+    RenderJob,
+    RenderTarget,
+    SegmentResult,
+    proxy_job,
+    render_segmented,
+    render_video,
+)
+from physics_studio.render.images import IMAGE_FORMATS
 from physics_studio.render.presets import PRESETS
+from physics_studio.render.profile import RenderProfile
+from physics_studio.render.renderer import RENDER_MODES
+from physics_studio.render.sampling import INTERPOLATION_METHODS
+from physics_studio.render.yuv import PIXEL_FORMATS
 from physics_studio.scenario.io import load_scenario
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Render a deterministic video export")
     parser.add_argument("scenario", help="Path to scenario JSON")
-    parser.add_argument("output", help="Output MP4 path")
+    parser.add_argument("output", help="Output MP4 path, or a directory for image sequences")
     parser.add_argument("--duration-s", type=float, help="Duration in seconds")
     parser.add_argument("--fps", type=int, help="Frames per second")
     parser.add_argument("--width", type=int, help="Frame width")
     parser.add_argument("--height", type=int, help="Frame height")
     parser.add_argument("--bitrate", type=str, help="Video bitrate (e.g. 8M)")
+    parser.add_argument(
+        "--trajectory",
+        help="Render from a trajectory written by physics-studio-simulate instead of re-simulating",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("mp4",) + IMAGE_FORMATS,
+        default="mp4",
+        help="Encode an MP4 or write one PNG/npy file per frame into the output directory",
+    )
+    parser.add_argument("--start-frame", type=int, default=0, help="First frame to render")
+    parser.add_argument(
+        "--end-frame", type=int, help="Stop before this frame (default: end of the export)"
+    )
     parser.add_argument("--preset", choices=sorted(PRESETS.keys()), help="Render preset")
     parser.add_argument("--trails", action="store_true", help="Render trails")
+    parser.add_argument(
+        "--mode",
+        choices=RENDER_MODES,
+        default="bodies",
+        help="Draw labeled bodies or a tone-mapped density splat",
+    )
+    parser.add_argument(
+        "--label-spacing",
+        type=int,
+        default=0,
+        help="Keep only the nearest body label in each N-pixel screen cell (0 labels every body)",
+    )
+    parser.add_argument(
+        "--density-exposure",
+        type=float,
+        default=4.0,
+        help="Bodies per pixel that reach about 63%% brightness in density mode",
+    )
+    parser.add_argument(
+        "--trail-seconds", type=float, help="Only draw the most recent N seconds of each trail"
+    )
+    parser.add_argument(
+        "--sample-every", type=int, default=1, help="Record every Nth simulation step"
+    )
+    parser.add_argument(
+        "--interpolation",
+        choices=INTERPOLATION_METHODS,
+        default="linear",
+        help="Interpolation between recorded samples",
+    )
+    parser.add_argument(
+        "--pixel-format",
+        choices=PIXEL_FORMATS,
+        default="rgb24",
+        help="Pixel format piped to ffmpeg (yuv420p converts on render workers, half the bytes)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes rendering frames in parallel",
+    )
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=1,
+        help="Split the timeline into N segments encoded in parallel and joined losslessly",
+    )
+    parser.add_argument(
+        "--proxy",
+        action="store_true",
+        help="Quick preview: quarter resolution, at most 15 fps, no labels or trails",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Print per-stage timings and throughput"
+    )
+    parser.add_argument("--profile-json", help="Also write the profile summary to this JSON file")
+    parser.add_argument(
+        "--also",
+        action="append",
+        default=[],
+        metavar="PRESET=PATH",
+        help="Encode another output from the same simulation (repeatable)",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Directory of rendered frames keyed by their inputs; unchanged frames are reused",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        help="Evict the least recently used cached frames beyond this many bytes",
+    )
+    parser.add_argument(
+        "--keep-segments", action="store_true", help="Keep segment files after joining"
+    )
     args = parser.parse_args()
 
     scenario_path = Path(args.scenario)
@@ -48,14 +150,70 @@ def main() -> None:
         height=height,
         bitrate=bitrate,
         show_trails=args.trails,
+        trail_seconds=args.trail_seconds,
+        workers=max(args.workers, 1),
+        trajectory_path=Path(args.trajectory) if args.trajectory else None,
+        mode=args.mode,
+        density_exposure=args.density_exposure,
+        label_spacing_px=max(args.label_spacing, 0),
+        pixel_format=args.pixel_format,
+        sample_every=max(args.sample_every, 1),
+        interpolation=args.interpolation,
+        start_frame=max(args.start_frame, 0),
+        end_frame=args.end_frame,
+        output_format=args.format,
+        cache_dir=Path(args.cache) if args.cache else None,
+        cache_max_bytes=args.cache_max_bytes,
     )
 
+    if args.proxy:
+        if args.also:
+            parser.error("--proxy renders a single preview; drop --also")
+        job = proxy_job(job)
+
+    profile = RenderProfile() if args.profile or args.profile_json else None
+    if profile is not None and (args.segments > 1 or job.output_format != "mp4"):
+        parser.error("--profile instruments single-pass mp4 exports; drop --segments or --format")
+
+    targets: list[RenderTarget] = []
+    for spec in args.also:
+        name, separator, path = spec.partition("=")
+        if not separator or name not in PRESETS or not path:
+            parser.error(f"--also expects PRESET=PATH with a preset from {sorted(PRESETS)}")
+        targets.append(RenderTarget.from_preset(PRESETS[name], Path(path)))
+    if targets:
+        targets.insert(
+            0,
+            RenderTarget(job.output_path, job.width, job.height, job.fps, job.bitrate),
+        )
+        if job.output_format != "mp4" or args.segments > 1:
+            parser.error("--also only works for a single-pass mp4 export")
+
     print(
         f"Rendering {job.output_path} at {job.width}x{job.height}, "
         f"{job.fps} fps, duration {job.duration_s:.2f}s"
     )
-    render_video(job)
+    if job.output_format != "mp4":
+        render_video(job)
+    elif args.segments > 1:
+
+        def report(result: SegmentResult, total: int) -> None:
+            state = "reused" if result.resumed else "rendered"
+            print(
+                f"Segment {result.index + 1}/{total} {state} "
+                f"(frames {result.start_frame}-{result.stop_frame - 1})"
+            )
+
+        render_segmented(job, args.segments, progress=report, keep_segments=args.keep_segments)
+    else:
+        for target in targets[1:]:
+            print(f"Also rendering {target.output_path} at {target.width}x{target.height}")
+        render_video(job, targets, profile=profile)
     print("Render complete.")
+    if profile is not None:
+        print(profile.format_summary())
+        if args.profile_json:
+            profile.write_json(Path(args.profile_json))
 
 
 if __name__ == "__main__":
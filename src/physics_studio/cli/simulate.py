@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import argparse
+from dataclasses import replace
 from pathlib import Path
 
+from physics_studio.core.determinism.hashing import HASH_ALGORITHMS, HASH_MODES
 from physics_studio.core.run.simulator import run_simulation
 from physics_studio.scenario.io import load_scenario, save_trajectory
 from physics_studio.scenario.trajectory_schema import (
@@ -16,6 +18,27 @@ def main() -> None:
     parser.add_argument("scenario", help="Path to scenario JSON")
     parser.add_argument("output", help="Path to output trajectory JSON")
     parser.add_argument("--hashes", action="store_true", help="Record snapshot hashes")
+    parser.add_argument(
+        "--hash-mode",
+        choices=HASH_MODES,
+        default="step",
+        help="Per-step hashes or chained hashes with periodic checkpoint roots",
+    )
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=100, help="Steps between chained checkpoints"
+    )
+    parser.add_argument("--hash-every", type=int, default=1, help="Hash every Nth step")
+    parser.add_argument(
+        "--hash-algorithm",
+        choices=HASH_ALGORITHMS,
+        default="sha256",
+        help="Digest for snapshot hashes (crc32/adler32 are faster, sha256 is the default)",
+    )
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        help="Record every Nth simulation step (defaults to scenario metadata or 1)",
+    )
     parser.add_argument(
         "--nondeterministic-metadata",
         action="store_true",
@@ -25,7 +48,16 @@ def main() -> None:
 
     scenario_path = Path(args.scenario)
     scenario = load_scenario(scenario_path)
-    config = scenario.settings.to_simulation_config(record_hashes=args.hashes)
+    sample_every = args.sample_every or scenario.metadata.get("sample_every", 1)
+    config = replace(
+        scenario.settings.to_simulation_config(
+            record_hashes=args.hashes, sample_every=max(int(sample_every), 1)
+        ),
+        hash_mode=args.hash_mode,
+        checkpoint_every=max(args.checkpoint_every, 1),
+        hash_every=max(args.hash_every, 1),
+        hash_algorithm=args.hash_algorithm,
+    )
     result = run_simulation(scenario.to_system_state(), scenario.events, config)
 
     content_hash = compute_content_hash(scenario_path)
@@ -36,8 +68,9 @@ def main() -> None:
         scenario_path=args.scenario,
         content_hash=content_hash,
         integrator="semi_implicit_euler",
-        sample_every=1,
-        hashes=result.hashes if args.hashes else None,
+        sample_every=config.sample_every,
+        hashes=result.hashes if args.hashes and args.hash_mode == "step" else None,
+        checkpoints=result.checkpoints if args.hashes and args.hash_mode == "chain" else None,
         include_created_utc=args.nondeterministic_metadata,
     )
 
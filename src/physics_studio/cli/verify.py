@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from physics_studio.core.determinism.hashing import HashCheckpoint
+from physics_studio.core.run.simulator import run_simulation
+from physics_studio.scenario.io import load_scenario
+
+GOLDEN_SCHEMA_VERSION = "golden_hashes_v1"
+GOLDEN_SUFFIX = ".golden.json"
+DEFAULT_CHECKPOINT_EVERY = 100
+
+
+@dataclass(frozen=True)
+class VerifyResult:
+    scenario: str
+    status: str
+    message: str
+    step_index: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("ok", "updated")
+
+
+def collect_scenarios(paths: list[Path]) -> list[Path]:
+    scenarios: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            scenarios.extend(sorted(path.glob("*.json")))
+        else:
+            scenarios.append(path)
+    return scenarios
+
+
+def golden_path(golden_dir: Path, scenario_path: Path) -> Path:
+    return golden_dir / f"{scenario_path.stem}{GOLDEN_SUFFIX}"
+
+
+def record_golden(scenario_path: Path, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY) -> dict:
+    scenario = load_scenario(scenario_path)
+    config = replace(
+        scenario.settings.to_simulation_config(record_hashes=True),
+        hash_mode="chain",
+        checkpoint_every=checkpoint_every,
+    )
+    result = run_simulation(scenario.to_system_state(), scenario.events, config)
+    return {
+        "schema_version": GOLDEN_SCHEMA_VERSION,
+        "scenario": scenario_path.name,
+        "dt": config.dt,
+        "steps": config.steps,
+        "hash_algorithm": config.hash_algorithm,
+        "checkpoint_every": checkpoint_every,
+        "checkpoints": [
+            {"step": checkpoint.step_index, "root": checkpoint.root}
+            for checkpoint in result.checkpoints
+        ],
+    }
+
+
+def verify_scenario(
+    scenario_path: Path,
+    golden_dir: Path,
+    update: bool = False,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+) -> VerifyResult:
+    name = scenario_path.name
+    target = golden_path(golden_dir, scenario_path)
+    if update:
+        golden = record_golden(scenario_path, checkpoint_every)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(golden, indent=2) + "\n", encoding="utf-8")
+        return VerifyResult(name, "updated", f"Wrote {len(golden['checkpoints'])} checkpoints")
+    if not target.exists():
+        return VerifyResult(name, "missing", f"No golden file at {target}")
+
+    golden = json.loads(target.read_text(encoding="utf-8"))
+    scenario = load_scenario(scenario_path)
+    config = replace(
+        scenario.settings.to_simulation_config(record_hashes=True),
+        hash_mode="chain",
+        hash_algorithm=golden["hash_algorithm"],
+        checkpoint_every=int(golden["checkpoint_every"]),
+    )
+    if config.dt != golden["dt"] or config.steps != golden["steps"]:
+        return VerifyResult(name, "mismatch", "Scenario dt/steps differ from golden file")
+
+    expected = {int(item["step"]): item["root"] for item in golden["checkpoints"]}
+    mismatch: list[HashCheckpoint] = []
+
+    def check(checkpoint: HashCheckpoint) -> bool:
+        if expected.get(checkpoint.step_index) != checkpoint.root:
+            mismatch.append(checkpoint)
+            return False
+        return True
+
+    result = run_simulation(scenario.to_system_state(), scenario.events, config, check)
+    if mismatch:
+        step_index = mismatch[0].step_index
+        return VerifyResult(
+            name, "mismatch", f"Hash chain diverged at checkpoint step {step_index}", step_index
+        )
+    if len(result.checkpoints) != len(expected):
+        return VerifyResult(
+            name,
+            "mismatch",
+            f"Expected {len(expected)} checkpoints, got {len(result.checkpoints)}",
+        )
+    return VerifyResult(name, "ok", f"{len(expected)} checkpoints match")
+
+
+def verify_all(
+    scenarios: list[Path],
+    golden_dir: Path,
+    workers: int = 1,
+    update: bool = False,
+    fail_fast: bool = True,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+) -> list[VerifyResult]:
+    results: list[VerifyResult] = []
+    if workers <= 1:
+        for scenario_path in scenarios:
+            result = verify_scenario(scenario_path, golden_dir, update, checkpoint_every)
+            results.append(result)
+            if fail_fast and not result.ok:
+                break
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(verify_scenario, path, golden_dir, update, checkpoint_every)
+            for path in scenarios
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if fail_fast and not result.ok:
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+    order = {path.name: index for index, path in enumerate(scenarios)}
+    return sorted(results, key=lambda item: order.get(item.scenario, len(order)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Verify example scenarios against stored golden hash checkpoints"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["examples/scenarios"],
+        help="Scenario files or directories (default: examples/scenarios)",
+    )
+    parser.add_argument(
+        "--golden-dir", default="examples/golden", help="Directory holding golden hash files"
+    )
+    parser.add_argument("--update", action="store_true", help="Rewrite golden hash files")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes"
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help="Steps between checkpoints when writing golden files",
+    )
+    parser.add_argument(
+        "--keep-going", action="store_true", help="Check every scenario after a mismatch"
+    )
+    args = parser.parse_args()
+
+    scenarios = collect_scenarios([Path(path) for path in args.paths])
+    results = verify_all(
+        scenarios,
+        Path(args.golden_dir),
+        workers=max(args.workers, 1),
+        update=args.update,
+        fail_fast=not args.keep_going,
+        checkpoint_every=max(args.checkpoint_every, 1),
+    )
+    for result in results:
+        print(f"[{result.status}] {result.scenario}: {result.message}")
+    skipped = len(scenarios) - len(results)
+    if skipped:
+        print(f"Skipped {skipped} scenario(s) after first failure.")
+    sys.exit(0 if results and all(result.ok for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
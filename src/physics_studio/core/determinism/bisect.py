@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from physics_studio.core.determinism.hashing import HashCheckpoint
+
+
+@dataclass(frozen=True)
+class CheckpointDivergence:
+    index: int
+    comparisons: int
+    last_match: HashCheckpoint | None
+    first_mismatch: HashCheckpoint
+
+
+@dataclass(frozen=True)
+class BodyDivergence:
+    step_index: int
+    body_ids: list[str]
+
+
+def find_divergent_checkpoint(
+    left: Sequence[HashCheckpoint], right: Sequence[HashCheckpoint]
+) -> CheckpointDivergence | None:
+    count = min(len(left), len(right))
+    comparisons = 0
+    low = 0
+    high = count
+    while low < high:
+        mid = (low + high) // 2
+        if left[mid].step_index != right[mid].step_index:
+            raise ValueError("Checkpoint cadences differ; cannot bisect")
+        comparisons += 1
+        if left[mid].root == right[mid].root:
+            low = mid + 1
+        else:
+            high = mid
+    if low == count:
+        if len(left) == len(right):
+            return None
+        raise ValueError("Checkpoint lists have different lengths")
+    return CheckpointDivergence(
+        index=low,
+        comparisons=comparisons,
+        last_match=left[low - 1] if low > 0 else None,
+        first_mismatch=left[low],
+    )
+
+
+def find_divergent_body(
+    body_ids: Sequence[str],
+    start_step: int,
+    left_window: Sequence[Sequence[str]],
+    right_window: Sequence[Sequence[str]],
+) -> BodyDivergence | None:
+    for offset, (left_hashes, right_hashes) in enumerate(
+        zip(left_window, right_window, strict=False)
+    ):
+        diverged = [
+            body_id
+            for body_id, left_hash, right_hash in zip(
+                body_ids, left_hashes, right_hashes, strict=True
+            )
+            if left_hash != right_hash
+        ]
+        if diverged:
+            return BodyDivergence(step_index=start_step + offset, body_ids=diverged)
+    return None
@@ -1,12 +1,82 @@
 from __future__ import annotations
 
 import hashlib
+import zlib
+from dataclasses import dataclass
+
 import numpy as np
 
+HASH_MODES = ("step", "chain")
+HASH_ALGORITHMS = ("sha256", "crc32", "adler32")
+_CHAIN_SEED = bytes(32)
+
+
+@dataclass(frozen=True, eq=False)
+class HashCheckpoint:
+    step_index: int
+    root: str
+    positions: np.ndarray
+    velocities: np.ndarray
+    thrusts: np.ndarray
+
+
+class _Checksum:
+    def __init__(self, func, initial: int) -> None:
+        self._func = func
+        self._value = initial
+
+    def update(self, data: bytes | memoryview) -> None:
+        self._value = self._func(data, self._value)
+
+    def hexdigest(self) -> str:
+        return f"{self._value:08x}"
+
+
+def _new_hasher(algorithm: str):
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    if algorithm == "crc32":
+        return _Checksum(zlib.crc32, 0)
+    if algorithm == "adler32":
+        return _Checksum(zlib.adler32, 1)
+    raise ValueError(f"Unknown hash algorithm: {algorithm}")
 
-def hash_state(step_index: int, positions: np.ndarray, velocities: np.ndarray) -> str:
-    hasher = hashlib.sha256()
+
+def _float64_buffer(array: np.ndarray) -> memoryview:
+    if array.dtype != np.float64 or not array.flags.c_contiguous:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+    return memoryview(array).cast("B")
+
+
+def hash_state(
+    step_index: int,
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    algorithm: str = "sha256",
+) -> str:
+    hasher = _new_hasher(algorithm)
     hasher.update(step_index.to_bytes(8, byteorder="little", signed=False))
-    hasher.update(positions.astype(np.float64).tobytes(order="C"))
-    hasher.update(velocities.astype(np.float64).tobytes(order="C"))
+    hasher.update(_float64_buffer(positions))
+    hasher.update(_float64_buffer(velocities))
+    return hasher.hexdigest()
+
+
+def hash_bodies(
+    step_index: int,
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    algorithm: str = "sha256",
+) -> list[str]:
+    return [
+        hash_state(
+            step_index, positions[index : index + 1], velocities[index : index + 1], algorithm
+        )
+        for index in range(positions.shape[0])
+    ]
+
+
+def chain_hash(previous: str | None, state_hash: str, algorithm: str = "sha256") -> str:
+    hasher = _new_hasher(algorithm)
+    hasher.update(bytes.fromhex(previous) if previous is not None else _CHAIN_SEED)
+    hasher.update(bytes.fromhex(state_hash))
     return hasher.hexdigest()
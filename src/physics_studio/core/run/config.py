@@ -12,3 +12,8 @@ class SimulationConfig:
     gravity: GravitySettings = GravitySettings()
     drag_coefficient: float = 0.0
     record_hashes: bool = False
+    sample_every: int = 1
+    hash_mode: str = "step"
+    hash_every: int = 1
+    hash_algorithm: str = "sha256"
+    checkpoint_every: int = 100
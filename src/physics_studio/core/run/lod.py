@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class LodLevel:
+    stride: int
+    times: np.ndarray
+    positions: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
+    extent: np.ndarray
+
+    @property
+    def num_windows(self) -> int:
+        return int(self.times.size)
+
+
+@dataclass(frozen=True)
+class TrajectoryLod:
+    levels: tuple[LodLevel, ...]
+
+    def level_for_columns(self, columns: int) -> LodLevel:
+        for level in reversed(self.levels):
+            if level.num_windows >= columns:
+                return level
+        return self.levels[0]
+
+    def select_levels(self, pixel_size: np.ndarray) -> np.ndarray:
+        extents = np.stack([level.extent for level in self.levels])
+        fits = extents <= np.asarray(pixel_size, dtype=np.float64)[None, :]
+        return np.maximum(np.cumprod(fits, axis=0).sum(axis=0) - 1, 0)
+
+
+def build_lod(
+    times: np.ndarray, positions: np.ndarray, factor: int = 4, min_windows: int = 2
+) -> TrajectoryLod:
+    factor = max(int(factor), 2)
+    count = positions.shape[1] if positions.ndim == 3 else 0
+    base = LodLevel(
+        stride=1,
+        times=times,
+        positions=positions,
+        mins=positions,
+        maxs=positions,
+        extent=np.zeros(count, dtype=np.float64),
+    )
+    levels = [base]
+    while levels[-1].num_windows > max(min_windows, 1) * factor:
+        levels.append(_decimate(levels[-1], factor))
+    return TrajectoryLod(levels=tuple(levels))
+
+
+def _decimate(level: LodLevel, factor: int) -> LodLevel:
+    windows = -(-level.num_windows // factor)
+    pad = windows * factor - level.num_windows
+    mins = level.mins
+    maxs = level.maxs
+    if pad:
+        mins = np.concatenate([mins, np.repeat(mins[-1:], pad, axis=0)])
+        maxs = np.concatenate([maxs, np.repeat(maxs[-1:], pad, axis=0)])
+    shape = (windows, factor) + mins.shape[1:]
+    mins = mins.reshape(shape).min(axis=1)
+    maxs = maxs.reshape(shape).max(axis=1)
+    extent = np.linalg.norm(maxs - mins, axis=2).max(axis=0) if windows else level.extent
+    return LodLevel(
+        stride=level.stride * factor,
+        times=level.times[::factor],
+        positions=level.positions[::factor],
+        mins=mins,
+        maxs=maxs,
+        extent=np.maximum(extent, level.extent),
+    )
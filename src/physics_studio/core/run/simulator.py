@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass, field
+from types import ModuleType
 
 import numpy as np
 
 from physics_studio.core.backends.registry import get_backend
-from physics_studio.core.determinism.hashing import hash_state
+from physics_studio.core.determinism.hashing import (
+    HashCheckpoint,
+    chain_hash,
+    hash_bodies,
+    hash_state,
+)
 from physics_studio.core.events.models import CameraMarkerEvent, Event, ImpulseEvent, ThrustChangeEvent
-from physics_studio.core.events.schedule import build_schedule
+from physics_studio.core.events.schedule import EventSchedule, build_schedule
 from physics_studio.core.forces.drag import compute_linear_drag_acceleration
 from physics_studio.core.forces.gravity import compute_gravity_acceleration
 from physics_studio.core.forces.thrust import compute_thrust_acceleration
@@ -22,6 +29,7 @@ class SimulationResult:
     trajectory: Trajectory
     hashes: list[str] = field(default_factory=list)
     camera_markers: list[dict] = field(default_factory=list)
+    checkpoints: list[HashCheckpoint] = field(default_factory=list)
 
 
 @dataclass(frozen=True)
@@ -46,13 +54,17 @@ def _collect_bodies(state: SystemState) -> dict[str, _BodyData]:
     return data
 
 
-def run_simulation(state: SystemState, events: list[Event], config: SimulationConfig) -> SimulationResult:
+def run_simulation(
+    state: SystemState,
+    events: list[Event],
+    config: SimulationConfig,
+    on_checkpoint: Callable[[HashCheckpoint], bool] | None = None,
+) -> SimulationResult:
     backend = get_backend()
     np_backend = backend.np
 
     body_data = _collect_bodies(state)
     order = build_body_order(body_data.keys())
-    count = len(order)
 
     positions = np_backend.array([body_data[bid].position for bid in order], dtype=np.float64)
     velocities = np_backend.array([body_data[bid].velocity for bid in order], dtype=np.float64)
@@ -64,32 +76,129 @@ def run_simulation(state: SystemState, events: list[Event], config: SimulationCo
 
     trajectory = Trajectory(body_ids=order)
     hashes: list[str] = []
+    checkpoints: list[HashCheckpoint] = []
     camera_markers: list[dict] = []
+    sample_every = max(config.sample_every, 1)
+    checkpoint_every = max(config.checkpoint_every, 1)
+    hash_every = max(config.hash_every, 1)
+    chain_root: str | None = None
 
     for step_index in range(config.steps + 1):
         time = step_index * config.dt
-        if config.record_hashes:
-            hashes.append(hash_state(step_index, positions, velocities))
-        trajectory.record(time, positions, velocities)
-
-        if step_index == config.steps:
+        is_last = step_index == config.steps
+        if config.record_hashes and (step_index % hash_every == 0 or is_last):
+            state_hash = hash_state(step_index, positions, velocities, config.hash_algorithm)
+            if config.hash_mode == "chain":
+                chain_root = chain_hash(chain_root, state_hash, config.hash_algorithm)
+                if step_index % checkpoint_every < hash_every or is_last:
+                    checkpoint = HashCheckpoint(
+                        step_index=step_index,
+                        root=chain_root,
+                        positions=positions.copy(),
+                        velocities=velocities.copy(),
+                        thrusts=thrusts.copy(),
+                    )
+                    checkpoints.append(checkpoint)
+                    if on_checkpoint is not None and not on_checkpoint(checkpoint):
+                        break
+            else:
+                hashes.append(state_hash)
+        if step_index % sample_every == 0 or is_last:
+            trajectory.record(time, positions, velocities)
+
+        if is_last:
             break
 
-        for event in schedule.events_at(step_index):
-            if isinstance(event, ImpulseEvent):
-                idx = id_to_index[event.body_id]
-                velocities[idx] = velocities[idx] + np_backend.array(event.delta_v, dtype=np.float64)
-            elif isinstance(event, ThrustChangeEvent):
-                idx = id_to_index[event.body_id]
-                thrusts[idx] = np_backend.array(event.thrust, dtype=np.float64)
-            elif isinstance(event, CameraMarkerEvent):
-                camera_markers.append({"time": event.time, "label": event.label})
-
-        gravity = compute_gravity_acceleration(positions, masses, config.gravity)
-        thrust = compute_thrust_acceleration(thrusts, masses)
-        drag = compute_linear_drag_acceleration(velocities, config.drag_coefficient)
-        acceleration = gravity + thrust + drag
+        _advance(
+            step_index,
+            positions,
+            velocities,
+            thrusts,
+            masses,
+            schedule,
+            id_to_index,
+            config,
+            camera_markers,
+            np_backend,
+        )
 
-        step(positions, velocities, acceleration, config.dt)
+    return SimulationResult(
+        trajectory=trajectory,
+        hashes=hashes,
+        camera_markers=camera_markers,
+        checkpoints=checkpoints,
+    )
+
+
+def replay_window(
+    state: SystemState,
+    events: list[Event],
+    config: SimulationConfig,
+    checkpoint: HashCheckpoint | None,
+    stop_step: int,
+) -> list[list[str]]:
+    np_backend = get_backend().np
+    body_data = _collect_bodies(state)
+    order = build_body_order(body_data.keys())
+    masses = np_backend.array([body_data[bid].mass for bid in order], dtype=np.float64)
+    if checkpoint is None:
+        start_step = 0
+        positions = np_backend.array([body_data[bid].position for bid in order], dtype=np.float64)
+        velocities = np_backend.array([body_data[bid].velocity for bid in order], dtype=np.float64)
+        thrusts = np_backend.array([body_data[bid].thrust for bid in order], dtype=np.float64)
+    else:
+        start_step = checkpoint.step_index
+        positions = checkpoint.positions.copy()
+        velocities = checkpoint.velocities.copy()
+        thrusts = checkpoint.thrusts.copy()
+    schedule = build_schedule(events, config.dt)
+    id_to_index = {bid: idx for idx, bid in enumerate(order)}
 
-    return SimulationResult(trajectory=trajectory, hashes=hashes, camera_markers=camera_markers)
+    window: list[list[str]] = []
+    for step_index in range(start_step, stop_step + 1):
+        window.append(hash_bodies(step_index, positions, velocities, config.hash_algorithm))
+        if step_index == stop_step:
+            break
+        _advance(
+            step_index,
+            positions,
+            velocities,
+            thrusts,
+            masses,
+            schedule,
+            id_to_index,
+            config,
+            [],
+            np_backend,
+        )
+    return window
+
+
+def _advance(
+    step_index: int,
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    thrusts: np.ndarray,
+    masses: np.ndarray,
+    schedule: EventSchedule,
+    id_to_index: dict[str, int],
+    config: SimulationConfig,
+    camera_markers: list[dict],
+    np_backend: ModuleType,
+) -> None:
+    for event in schedule.events_at(step_index):
+        if isinstance(event, ImpulseEvent):
+            idx = id_to_index[event.body_id]
+            velocities[idx] = velocities[idx] + np_backend.array(event.delta_v, dtype=np.float64)
+        elif isinstance(event, ThrustChangeEvent):
+            idx = id_to_index[event.body_id]
+            thrusts[idx] = np_backend.array(event.thrust, dtype=np.float64)
+        elif isinstance(event, CameraMarkerEvent):
+            camera_markers.append({"time": event.time, "label": event.label})
+
+    gravity = compute_gravity_acceleration(positions, masses, config.gravity)
+    thrust = compute_thrust_acceleration(thrusts, masses)
+    drag = compute_linear_drag_acceleration(velocities, config.drag_coefficient)
+    acceleration = gravity + thrust + drag
+
+    step(positions, velocities, acceleration, config.dt)
@@ -5,6 +5,8 @@ from typing import Iterable
 
 import numpy as np
 
+from physics_studio.core.run.lod import TrajectoryLod, build_lod
+
 
 @dataclass
 class Trajectory:
@@ -12,11 +14,37 @@ class Trajectory:
     times: list[float] = field(default_factory=list)
     positions: list[list[list[float]]] = field(default_factory=list)
     velocities: list[list[list[float]]] = field(default_factory=list)
+    _lod: TrajectoryLod | None = field(default=None, init=False, repr=False, compare=False)
+    _arrays: tuple[np.ndarray, np.ndarray, np.ndarray] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def record(self, time: float, positions: np.ndarray, velocities: np.ndarray) -> None:
         self.times.append(float(time))
         self.positions.append(positions.tolist())
         self.velocities.append(velocities.tolist())
+        self._arrays = None
+        self._lod = None
+
+    @property
+    def lod(self) -> TrajectoryLod:
+        if self._lod is None or self._lod.levels[0].num_windows != len(self.times):
+            times, positions, _ = self.as_arrays()
+            self._lod = build_lod(times, positions)
+        return self._lod
+
+    def as_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._arrays is not None and self._arrays[0].shape[0] == len(self.times):
+            return self._arrays
+        count = len(self.body_ids)
+        samples = len(self.times)
+        times = np.asarray(self.times, dtype=np.float64)
+        positions = np.asarray(self.positions, dtype=np.float64).reshape(samples, count, 3)
+        velocities = np.asarray(self.velocities, dtype=np.float64).reshape(samples, count, 3)
+        for array in (times, positions, velocities):
+            array.flags.writeable = False
+        self._arrays = (times, positions, velocities)
+        return self._arrays
 
     def to_dict(self) -> dict:
         return {
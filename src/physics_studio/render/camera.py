@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+
+import numpy as np
+
+from physics_studio.scenario.models import CameraKeyframe, CameraState, CameraTrack
+
+_DEFAULT_STATE = CameraState(position=(0.0, 0.0, 50.0), target=(0.0, 0.0, 0.0), fov_deg=60.0)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.sqrt(np.sum(vectors * vectors, axis=1))
+    zero = norms == 0.0
+    return np.where(zero[:, None], vectors, vectors / np.where(zero, 1.0, norms)[:, None])
+
+
+def camera_bases(
+    positions: np.ndarray, targets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    forward = _normalize_rows(targets - positions)
+    forward[np.isclose(forward, 0.0).all(axis=1)] = (0.0, 0.0, -1.0)
+    up_guess = np.array([0.0, 0.0, 1.0], dtype=np.float64)
+    right = _normalize_rows(np.cross(forward, up_guess))
+    right[np.isclose(right, 0.0).all(axis=1)] = (1.0, 0.0, 0.0)
+    up = _normalize_rows(np.cross(right, forward))
+    return right, up, forward
+
+
+def view_matrices(positions: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    right, up, forward = camera_bases(positions, targets)
+    views = np.zeros((positions.shape[0], 4, 4), dtype=np.float64)
+    views[:, 0, :3] = right
+    views[:, 1, :3] = up
+    views[:, 2, :3] = -forward
+    views[:, :3, 3] = -np.einsum("fij,fj->fi", views[:, :3, :3], positions)
+    views[:, 3, 3] = 1.0
+    return views
+
+
+def view_matrix(camera: CameraState) -> np.ndarray:
+    return view_matrices(
+        np.array([camera.position], dtype=np.float64),
+        np.array([camera.target], dtype=np.float64),
+    )[0]
+
+
+@dataclass(frozen=True)
+class CameraFrames:
+    times: np.ndarray
+    positions: np.ndarray
+    targets: np.ndarray
+    fovs: np.ndarray
+    views: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.times.shape[0])
+
+    def state(self, index: int) -> CameraState:
+        return CameraState(
+            position=tuple(self.positions[index].tolist()),
+            target=tuple(self.targets[index].tolist()),
+            fov_deg=float(self.fovs[index]),
+        )
+
+
+class CompiledCameraTrack:
+    def __init__(self, keyframes: list[CameraKeyframe], default_fov_deg: float = 60.0) -> None:
+        order = sorted(range(len(keyframes)), key=lambda index: keyframes[index].time_s)
+        ordered = [keyframes[index] for index in order]
+        self.times = np.array([frame.time_s for frame in ordered], dtype=np.float64)
+        self.positions = np.array([frame.position for frame in ordered], dtype=np.float64)
+        self.targets = np.array([frame.target for frame in ordered], dtype=np.float64)
+        self.fovs = np.array(
+            [frame.fov_deg if frame.fov_deg is not None else default_fov_deg for frame in ordered],
+            dtype=np.float64,
+        )
+        for array in (self.times, self.positions, self.targets, self.fovs):
+            array.flags.writeable = False
+
+    def evaluate(self, time_s: float) -> CameraState:
+        return self.evaluate_many(np.array([time_s], dtype=np.float64)).state(0)
+
+    def evaluate_many(self, times: np.ndarray) -> CameraFrames:
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        count = times.shape[0]
+        if self.times.size == 0:
+            positions = np.tile(np.array(_DEFAULT_STATE.position), (count, 1))
+            targets = np.tile(np.array(_DEFAULT_STATE.target), (count, 1))
+            fovs = np.full(count, _DEFAULT_STATE.fov_deg)
+        else:
+            right = np.clip(np.searchsorted(self.times, times, side="left"), 1, None)
+            right = np.minimum(right, self.times.size - 1)
+            left = np.maximum(right - 1, 0)
+            span = np.maximum(self.times[right] - self.times[left], 1e-9)
+            t = ((times - self.times[left]) / span)[:, None]
+            positions = self.positions[left] + (self.positions[right] - self.positions[left]) * t
+            targets = self.targets[left] + (self.targets[right] - self.targets[left]) * t
+            fovs = self.fovs[left] + (self.fovs[right] - self.fovs[left]) * t[:, 0]
+            for clamp, index in ((times >= self.times[-1], -1), (times <= self.times[0], 0)):
+                positions[clamp] = self.positions[index]
+                targets[clamp] = self.targets[index]
+                fovs[clamp] = self.fovs[index]
+        return CameraFrames(
+            times=times,
+            positions=positions,
+            targets=targets,
+            fovs=fovs,
+            views=view_matrices(positions, targets),
+        )
+
+
+def compile_camera_track(track: CameraTrack) -> CompiledCameraTrack:
+    return _compile(tuple(track.keyframes), track.default_fov_deg)
+
+
+@functools.lru_cache(maxsize=16)
+def _compile(keyframes: tuple[CameraKeyframe, ...], default_fov_deg: float) -> CompiledCameraTrack:
+    return CompiledCameraTrack(list(keyframes), default_fov_deg)
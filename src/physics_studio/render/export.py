@@ -1,13 +1,48 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import queue
+import shutil
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 
+import numpy as np
+
+from physics_studio.core.run.lod import TrajectoryLod, build_lod
 from physics_studio.core.run.simulator import run_simulation
-from physics_studio.render.renderer import RenderBody, RenderOptions, render_frame
-from physics_studio.render.sampling import sample_trajectory
-from physics_studio.scenario.io import load_scenario
+from physics_studio.render.camera import CameraFrames, compile_camera_track
+from physics_studio.render.frame_cache import FrameCache
+from physics_studio.render.images import IMAGE_FORMATS, write_image
+from physics_studio.render.presets import RenderPreset
+from physics_studio.render.profile import RenderProfile, timed
+from physics_studio.render.renderer import (
+    RENDER_MODES,
+    RenderBody,
+    RenderOptions,
+    render_density_frame,
+    render_frame,
+)
+from physics_studio.render.sampling import interpolate_positions
+from physics_studio.render.trails import TrailLayer
+from physics_studio.render.yuv import Yuv420Converter, frame_shape
+from physics_studio.scenario.io import TrajectoryFile, load_scenario, load_trajectory_file
+from physics_studio.scenario.models import CameraState, CameraTrack, Scenario
+from physics_studio.scenario.trajectory_schema import compute_content_hash
+
+
+class ExportCancelled(RuntimeError):
+    pass
+
+
+PROXY_SCALE = 0.25
+PROXY_MAX_FPS = 15
 
 
 @dataclass(frozen=True)
@@ -20,35 +55,866 @@ class RenderJob:
     height: int
     bitrate: str
     show_trails: bool = False
+    sample_every: int = 1
+    interpolation: str = "linear"
+    trail_seconds: float | None = None
+    workers: int = 1
+    queue_depth: int = 4
+    trajectory_path: Path | None = None
+    mode: str = "bodies"
+    density_exposure: float = 4.0
+    label_spacing_px: int = 0
+    pixel_format: str = "rgb24"
+    start_frame: int = 0
+    end_frame: int | None = None
+    output_format: str = "mp4"
+    cache_dir: Path | None = None
+    cache_max_bytes: int | None = None
+    show_labels: bool = True
+    encoder_preset: str | None = None
+
+
+@dataclass(frozen=True)
+class _FrameInputs:
+    time_s: float
+    positions: np.ndarray
+    camera: CameraState
+    view: np.ndarray
+
+
+class FrameRenderer:
+    def __init__(
+        self,
+        options: RenderOptions,
+        fps: int,
+        body_ids: list[str],
+        radii: list[int],
+        sample_times: np.ndarray,
+        sample_positions: np.ndarray,
+        sample_velocities: np.ndarray,
+        camera_track: CameraTrack,
+        frames: range,
+        interpolation: str = "linear",
+        lod: TrajectoryLod | None = None,
+        trail_seconds: float | None = None,
+        source_path: Path | None = None,
+        pixel_format: str = "rgb24",
+        cache_dir: Path | None = None,
+        cache_max_bytes: int | None = None,
+        cameras: CameraFrames | None = None,
+        profile: RenderProfile | None = None,
+    ) -> None:
+        self.options = options
+        self.fps = fps
+        self.body_ids = body_ids
+        self.radii = radii
+        self.sample_times = sample_times
+        self.sample_positions = sample_positions
+        self.sample_velocities = sample_velocities
+        self.camera_track = compile_camera_track(camera_track)
+        self.first_frame = frames.start
+        self.profile = profile
+        if cameras is None or len(cameras) != len(frames):
+            with timed(profile, "camera"):
+                times = np.arange(frames.start, frames.stop) / fps
+                cameras = self.camera_track.evaluate_many(times)
+        self.cameras = cameras
+        self.interpolation = interpolation
+        self.lod = lod
+        self.trail_seconds = trail_seconds
+        self.source_path = source_path
+        self.pixel_format = pixel_format
+        self.frame_shape = frame_shape(pixel_format, options.width, options.height)
+        self._trail_layer: TrailLayer | None = None
+        self._converter: Yuv420Converter | None = None
+        self._scratch: np.ndarray | None = None
+        self._block: tuple[int, np.ndarray] = (0, _NO_BLOCK)
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self._cache: FrameCache | None = None
+        self._trail_key: bytes | None = None
+        self._static_key = repr(
+            (_CACHE_VERSION, options, pixel_format, list(body_ids), list(radii))
+        ).encode("utf-8")
+
+    def render(self, frame_index: int, out: np.ndarray | None = None) -> np.ndarray:
+        return self._rasterize(self._inputs(frame_index), out)
+
+    def render_encoded(self, frame_index: int, out: np.ndarray | None = None) -> np.ndarray:
+        if self.cache_dir is None:
+            return self._encode(self._inputs(frame_index), out)
+        if self._cache is None:
+            self._cache = FrameCache(self.cache_dir, self.cache_max_bytes)
+        if out is None:
+            out = np.empty(self.frame_shape, dtype=np.uint8)
+        inputs = self._inputs(frame_index)
+        key = self._frame_key(inputs)
+        with timed(self.profile, "cache"):
+            hit = self._cache.load(key, out)
+        if hit:
+            return out
+        frame = self._encode(inputs, out)
+        with timed(self.profile, "cache"):
+            self._cache.store(key, frame)
+        return frame
+
+    def frame_key(self, frame_index: int) -> str:
+        return self._frame_key(self._inputs(frame_index))
+
+    def _inputs(self, frame_index: int) -> _FrameInputs:
+        time_s = frame_index / self.fps
+        with timed(self.profile, "sample"):
+            positions = self._positions_at(frame_index)
+        cameras = self.cameras
+        slot = frame_index - self.first_frame
+        if not 0 <= slot < len(cameras):
+            cameras = self.camera_track.evaluate_many(np.array([time_s]))
+            slot = 0
+        return _FrameInputs(time_s, positions, cameras.state(slot), cameras.views[slot])
+
+    def _positions_at(self, frame_index: int) -> np.ndarray:
+        start, block = self._block
+        if start <= frame_index < start + block.shape[0]:
+            return block[frame_index - start]
+        sequential = frame_index == start + block.shape[0]
+        frames = min(block.shape[0] * 2, _BLOCK_FRAMES) if sequential else 1
+        bodies = max(self.sample_positions.shape[1], 1)
+        frames = max(1, min(frames, _BLOCK_VALUES // (bodies * 3)))
+        block = interpolate_positions(
+            self.sample_times,
+            self.sample_positions,
+            self.sample_velocities,
+            np.arange(frame_index, frame_index + frames) / self.fps,
+            method=self.interpolation,
+        )
+        self._block = (frame_index, block)
+        return block[0]
+
+    def _frame_key(self, inputs: _FrameInputs) -> str:
+        with timed(self.profile, "cache"):
+            digest = hashlib.blake2b(self._static_key, digest_size=20)
+            digest.update(np.array([inputs.time_s, inputs.camera.fov_deg]).tobytes())
+            digest.update(np.ascontiguousarray(inputs.view).tobytes())
+            digest.update(np.ascontiguousarray(inputs.positions).tobytes())
+            if self.options.show_trails:
+                digest.update(self._trail_fingerprint())
+            return digest.hexdigest()
+
+    def _trail_fingerprint(self) -> bytes:
+        # Trails are a pure function of the camera, the time and the recorded samples, so
+        # the samples are hashed once rather than hashing each frame's trail raster.
+        if self._trail_key is None:
+            digest = hashlib.blake2b(digest_size=20)
+            digest.update(repr((self.trail_seconds, self.lod is not None)).encode())
+            digest.update(np.ascontiguousarray(self.sample_times).tobytes())
+            digest.update(np.ascontiguousarray(self.sample_positions).tobytes())
+            self._trail_key = digest.digest()
+        return self._trail_key
+
+    def _trails(self) -> TrailLayer:
+        if self._trail_layer is None:
+            self._trail_layer = TrailLayer(
+                self.options.width,
+                self.options.height,
+                self.body_ids,
+                self.sample_times,
+                self.sample_positions,
+                lod=self.lod,
+                max_age_s=self.trail_seconds,
+            )
+        return self._trail_layer
+
+    def _rasterize(self, inputs: _FrameInputs, out: np.ndarray | None) -> np.ndarray:
+        time_s, positions = inputs.time_s, inputs.positions
+        camera, view = inputs.camera, inputs.view
+        if self.options.mode == "density":
+            with timed(self.profile, "rasterize"):
+                return render_density_frame(
+                    positions, camera, self.options, time_s=time_s, out=out, view=view
+                )
+
+        bodies = [
+            RenderBody(id=body_id, position=tuple(positions[index]), radius_px=radius)
+            for index, (body_id, radius) in enumerate(zip(self.body_ids, self.radii, strict=True))
+        ]
+        background = None
+        if self.options.show_trails:
+            with timed(self.profile, "trails"):
+                trails = self._trails()
+                background = trails.render(camera, time_s, positions, out=out, view=view)
+        with timed(self.profile, "rasterize"):
+            return render_frame(
+                bodies,
+                camera,
+                self.options,
+                time_s=time_s,
+                background=background,
+                out=out,
+                view=view,
+            )
+
+    def _encode(self, inputs: _FrameInputs, out: np.ndarray | None) -> np.ndarray:
+        if self.pixel_format == "rgb24":
+            return self._rasterize(inputs, out)
+        if self._converter is None:
+            self._converter = Yuv420Converter(self.options.width, self.options.height)
+            self._scratch = np.empty(
+                (self.options.height, self.options.width, 3), dtype=np.uint8
+            )
+        frame = self._rasterize(inputs, self._scratch)
+        with timed(self.profile, "convert"):
+            return self._converter.convert(frame, out=out)
+
+    def reset(self) -> None:
+        self._trail_layer = None
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_trail_layer"] = None
+        state["_converter"] = None
+        state["_scratch"] = None
+        state["_block"] = (0, _NO_BLOCK)
+        state["_cache"] = None
+        if self.source_path is not None and isinstance(self.sample_positions, np.memmap):
+            for key in ("sample_times", "sample_positions", "sample_velocities", "lod"):
+                state[key] = None
+            state["_rebuild_lod"] = self.lod is not None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        rebuild_lod = state.pop("_rebuild_lod", False)
+        self.__dict__.update(state)
+        if self.sample_positions is None and self.source_path is not None:
+            source = load_trajectory_file(self.source_path)
+            self.sample_times = source.times
+            self.sample_positions = source.positions
+            self.sample_velocities = source.velocities
+            if rebuild_lod:
+                self.lod = build_lod(self.sample_times, self.sample_positions)
+
+
+@dataclass(frozen=True)
+class RenderTarget:
+    output_path: Path
+    width: int
+    height: int
+    fps: int
+    bitrate: str
+    pixel_format: str | None = None
 
-def render_video(job: RenderJob) -> None:
+    @staticmethod
+    def from_preset(preset: RenderPreset, output_path: Path) -> RenderTarget:
+        return RenderTarget(
+            output_path=Path(output_path),
+            width=preset.width,
+            height=preset.height,
+            fps=preset.fps,
+            bitrate=preset.bitrate,
+        )
+
+    def apply(self, job: RenderJob) -> RenderJob:
+        return replace(
+            job,
+            output_path=self.output_path,
+            width=self.width,
+            height=self.height,
+            fps=self.fps,
+            bitrate=self.bitrate,
+            pixel_format=self.pixel_format or job.pixel_format,
+        )
+
+
+@dataclass(frozen=True)
+class _RenderSource:
+    scenario: Scenario
+    body_ids: list[str]
+    times: np.ndarray
+    positions: np.ndarray
+    velocities: np.ndarray
+    lod: TrajectoryLod | None
+
+
+def prepare_frame_renderer(
+    job: RenderJob, profile: RenderProfile | None = None
+) -> FrameRenderer:
+    _validate_job(job)
+    with timed(profile, "simulate"):
+        source = _load_source(job)
+    return _build_renderer(job, source, profile=profile)
+
+
+def _validate_job(job: RenderJob) -> None:
+    if job.mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {job.mode}")
+    frame_shape(job.pixel_format, job.width, job.height)
+    if job.pixel_format == "yuv420p" and (job.width % 2 or job.height % 2):
+        raise ValueError("yuv420p output needs an even frame width and height")
+
+
+def _load_source(job: RenderJob) -> _RenderSource:
     scenario = load_scenario(job.scenario_path)
-    config = scenario.settings.to_simulation_config(record_hashes=False)
+    if job.trajectory_path is not None:
+        source = load_trajectory_for_scenario(job.trajectory_path, job.scenario_path)
+        lod = build_lod(source.times, source.positions) if job.show_trails else None
+        return _RenderSource(
+            scenario, source.body_ids, source.times, source.positions, source.velocities, lod
+        )
+    config = scenario.settings.to_simulation_config(
+        record_hashes=False, sample_every=job.sample_every
+    )
     result = run_simulation(scenario.to_system_state(), scenario.events, config)
     trajectory = result.trajectory
+    times, positions, velocities = trajectory.as_arrays()
+    lod = trajectory.lod if job.show_trails else None
+    return _RenderSource(scenario, trajectory.body_ids, times, positions, velocities, lod)
 
-    frame_count = int(round(job.duration_s * job.fps))
+
+def _build_renderer(
+    job: RenderJob,
+    source: _RenderSource,
+    cameras: CameraFrames | None = None,
+    profile: RenderProfile | None = None,
+) -> FrameRenderer:
     options = RenderOptions(
         width=job.width,
         height=job.height,
         show_timecode=True,
-        show_labels=True,
-        show_trails=job.show_trails,
+        show_labels=job.show_labels,
+        show_trails=job.show_trails and job.mode == "bodies",
+        mode=job.mode,
+        density_exposure=job.density_exposure,
+        label_cell_px=job.label_spacing_px,
     )
-
+    scenario = source.scenario
     body_lookup = {
         body.id: body for body in scenario.particles + scenario.rigid_bodies
     }
-    body_ids = trajectory.body_ids
+    radii = [6 if body_lookup.get(body_id, None) else 4 for body_id in source.body_ids]
+    return FrameRenderer(
+        options,
+        job.fps,
+        source.body_ids,
+        radii,
+        source.times,
+        source.positions,
+        source.velocities,
+        scenario.camera_track,
+        job_frames(job),
+        interpolation=job.interpolation,
+        lod=source.lod,
+        trail_seconds=job.trail_seconds,
+        source_path=job.trajectory_path,
+        pixel_format=job.pixel_format,
+        cache_dir=job.cache_dir,
+        cache_max_bytes=job.cache_max_bytes,
+        cameras=cameras,
+        profile=profile,
+    )
+
+
+def load_trajectory_for_scenario(trajectory_path: Path, scenario_path: Path) -> TrajectoryFile:
+    source = load_trajectory_file(trajectory_path)
+    recorded = source.header.get("scenario", {}).get("content_hash")
+    if recorded is None:
+        raise ValueError(f"{trajectory_path} does not record a scenario content hash")
+    actual = compute_content_hash(Path(scenario_path))
+    if recorded != actual:
+        raise ValueError(
+            f"{trajectory_path} was simulated from a different scenario "
+            f"(content hash {recorded[:12]} != {actual[:12]})"
+        )
+    if source.num_samples == 0:
+        raise ValueError(f"{trajectory_path} contains no samples")
+    return source
+
+
+def proxy_job(
+    job: RenderJob, scale: float = PROXY_SCALE, max_fps: int = PROXY_MAX_FPS
+) -> RenderJob:
+    fps = max(1, min(job.fps, max_fps))
+    end_frame = None
+    if job.end_frame is not None:
+        end_frame = -(-job.end_frame * fps // job.fps)
+    return replace(
+        job,
+        width=max(2, int(job.width * scale) // 2 * 2),
+        height=max(2, int(job.height * scale) // 2 * 2),
+        fps=fps,
+        bitrate="1M",
+        show_trails=False,
+        show_labels=False,
+        start_frame=job.start_frame * fps // job.fps,
+        end_frame=end_frame,
+        encoder_preset="ultrafast",
+    )
+
+
+def job_frames(job: RenderJob) -> range:
+    frame_count = int(round(job.duration_s * job.fps))
+    stop = frame_count if job.end_frame is None else min(job.end_frame, frame_count)
+    frames = range(max(job.start_frame, 0), stop)
+    if len(frames) == 0:
+        raise ValueError(
+            f"Frame range {job.start_frame}-{job.end_frame} selects no frames "
+            f"(the export has {frame_count})"
+        )
+    return frames
+
+
+def render_video(
+    job: RenderJob,
+    targets: Sequence[RenderTarget] | None = None,
+    profile: RenderProfile | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> None:
+    start = time.perf_counter()
+    try:
+        _render_video(job, targets, profile, progress, cancel)
+    finally:
+        if profile is not None:
+            profile.wall_s += time.perf_counter() - start
+
+
+def _render_video(
+    job: RenderJob,
+    targets: Sequence[RenderTarget] | None,
+    profile: RenderProfile | None,
+    progress: Callable[[int, int], None] | None,
+    cancel: threading.Event | None,
+) -> None:
+    if job.output_format != "mp4":
+        if targets:
+            raise ValueError("Multiple outputs are only supported for mp4 exports")
+        render_image_sequence(job)
+        return
+    _check_cancelled(cancel, job.output_path)
+    if not targets:
+        renderer = prepare_frame_renderer(job, profile)
+        _check_cancelled(cancel, job.output_path)
+        frames = job_frames(job)
+        on_frame = _progress_counter(progress, len(frames))
+        _encode_frames(
+            renderer, job, frames, job.output_path, job.workers, on_frame=on_frame, cancel=cancel
+        )
+        return
+
+    jobs = [target.apply(job) for target in targets]
+    for target_job in jobs:
+        _validate_job(target_job)
+    with timed(profile, "simulate"):
+        source = _load_source(job)
+    _check_cancelled(cancel, job.output_path)
+    track = compile_camera_track(source.scenario.camera_track)
+    shared: dict[tuple[int, int, int], CameraFrames] = {}
+    renderers = []
+    for target_job in jobs:
+        frames = job_frames(target_job)
+        key = (target_job.fps, frames.start, frames.stop)
+        if key not in shared:
+            with timed(profile, "camera"):
+                times = np.arange(frames.start, frames.stop) / key[0]
+                shared[key] = track.evaluate_many(times)
+        renderers.append(_build_renderer(target_job, source, shared[key], profile))
+
+    workers = max(1, job.workers // len(jobs))
+    total = sum(len(job_frames(target_job)) for target_job in jobs)
+    on_frame = _progress_counter(progress, total)
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [
+            executor.submit(
+                _encode_frames,
+                renderer,
+                target_job,
+                job_frames(target_job),
+                target_job.output_path,
+                workers,
+                on_frame,
+                cancel,
+            )
+            for renderer, target_job in zip(renderers, jobs, strict=True)
+        ]
+        for future in futures:
+            future.result()
+
+
+def _check_cancelled(cancel: threading.Event | None, output_path: Path) -> None:
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled(f"Export to {output_path} was cancelled")
+
+
+def _progress_counter(
+    progress: Callable[[int, int], None] | None, total: int
+) -> Callable[[], None] | None:
+    if progress is None:
+        return None
+    lock = threading.Lock()
+    done = 0
+
+    def on_frame() -> None:
+        nonlocal done
+        with lock:
+            done += 1
+            progress(done, total)
+
+    return on_frame
+
+
+def render_image_sequence(job: RenderJob) -> list[Path]:
+    if job.output_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {job.output_format}")
+    renderer = prepare_frame_renderer(replace(job, pixel_format="rgb24"))
+    frames = job_frames(job)
+    job.output_path.mkdir(parents=True, exist_ok=True)
+    paths = [job.output_path / f"frame_{index:06d}.{job.output_format}" for index in frames]
+    if job.workers <= 1:
+        for frame_index, path in zip(frames, paths, strict=True):
+            write_image(path, renderer.render(frame_index))
+        return paths
+
+    with ProcessPoolExecutor(
+        max_workers=job.workers, initializer=_init_worker, initargs=(renderer,)
+    ) as executor:
+        chunksize = max(1, len(frames) // (job.workers * 8))
+        for _ in executor.map(_write_image_in_worker, frames, paths, chunksize=chunksize):
+            pass
+    return paths
+
+
+def iter_frames(renderer: FrameRenderer, frames: range, workers: int = 1) -> Iterator[bytes]:
+    if workers <= 1:
+        for frame_index in frames:
+            yield renderer.render_encoded(frame_index).tobytes(order="C")
+        return
+
+    window = workers * 2
+    profile = renderer.profile
+    frame_bytes = int(np.prod(renderer.frame_shape))
+
+    def collect(future: Future[tuple[bytes, dict[str, float]]]) -> bytes:
+        frame, seconds = future.result()
+        if profile is not None:
+            profile.merge(seconds)
+            profile.hold(-frame_bytes)
+        return frame
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(renderer,)
+    ) as executor:
+        pending: deque[Future[tuple[bytes, dict[str, float]]]] = deque()
+        remaining = iter(frames)
+        try:
+            for frame_index in remaining:
+                pending.append(executor.submit(_render_in_worker, frame_index))
+                if profile is not None:
+                    profile.hold(frame_bytes)
+                if len(pending) >= window:
+                    yield collect(pending.popleft())
+            while pending:
+                yield collect(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@dataclass(frozen=True)
+class SegmentResult:
+    index: int
+    start_frame: int
+    stop_frame: int
+    path: Path
+    resumed: bool
+
+
+def plan_segments(frames: range, segments: int) -> list[range]:
+    count = len(frames)
+    segments = max(1, min(segments, count))
+    bounds = [frames.start + count * index // segments for index in range(segments + 1)]
+    return [range(bounds[index], bounds[index + 1]) for index in range(segments)]
+
+
+def segment_dir(output_path: Path) -> Path:
+    return output_path.with_name(f"{output_path.name}.segments")
+
+
+def render_segmented(
+    job: RenderJob,
+    segments: int,
+    progress: Callable[[SegmentResult, int], None] | None = None,
+    keep_segments: bool = False,
+) -> list[SegmentResult]:
+    plan = plan_segments(job_frames(job), segments)
+    work_dir = segment_dir(job.output_path)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = _job_fingerprint(job)
+
+    results: list[SegmentResult] = []
+    todo: list[tuple[int, range, Path, str]] = []
+    for index, frames in enumerate(plan):
+        path = work_dir / f"segment_{index:04d}.mp4"
+        marker = path.with_suffix(".done")
+        stamp = f"{fingerprint}:{frames.start}:{frames.stop}"
+        if path.exists() and marker.exists() and marker.read_text(encoding="utf-8") == stamp:
+            result = SegmentResult(index, frames.start, frames.stop, path, resumed=True)
+            results.append(result)
+            if progress is not None:
+                progress(result, len(plan))
+        else:
+            todo.append((index, frames, path, stamp))
+
+    if todo:
+        renderer = prepare_frame_renderer(job)
+        workers = max(1, min(job.workers, len(todo)))
+        errors: list[Exception] = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(renderer,)
+        ) as executor:
+            futures = {
+                executor.submit(_render_segment_in_worker, job, frames, path, stamp): (
+                    index,
+                    frames,
+                    path,
+                )
+                for index, frames, path, stamp in todo
+            }
+            for future in as_completed(futures):
+                index, frames, path = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    errors.append(error)
+                    continue
+                result = SegmentResult(index, frames.start, frames.stop, path, resumed=False)
+                results.append(result)
+                if progress is not None:
+                    progress(result, len(plan))
+        if errors:
+            raise errors[0]
+
+    results.sort(key=lambda item: item.index)
+    _concat_segments([result.path for result in results], job.output_path, work_dir)
+    if not keep_segments:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def _encode_frames(
+    renderer: FrameRenderer,
+    job: RenderJob,
+    frames: range,
+    output_path: Path,
+    workers: int,
+    on_frame: Callable[[], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> None:
+    process = subprocess.Popen(_ffmpeg_command(job, output_path), stdin=subprocess.PIPE)
+    if process.stdin is None:
+        raise RuntimeError("Failed to open ffmpeg stdin")
+
+    pipeline = FramePipeline(
+        process.stdin, renderer.frame_shape, depth=job.queue_depth, profile=renderer.profile
+    )
+    cancelled = False
+    try:
+        if workers <= 1:
+            encoded: Generator[np.ndarray | bytes, None, None] = (
+                renderer.render_encoded(frame_index, out=pipeline.acquire())
+                for frame_index in frames
+            )
+        else:
+            encoded = iter_frames(renderer, frames, workers)
+        for frame in encoded:
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                encoded.close()
+                break
+            pipeline.submit(frame)
+            if on_frame is not None:
+                on_frame()
+        if not cancelled:
+            pipeline.close()
+    finally:
+        pipeline.abort()
+        with timed(renderer.profile, "ffmpeg_finish"):
+            process.stdin.close()
+            if cancelled:
+                process.terminate()
+            process.wait()
+    if cancelled:
+        output_path.unlink(missing_ok=True)
+        raise ExportCancelled(f"Export to {output_path} was cancelled")
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed with exit code {process.returncode}")
+
+
+def _render_segment_in_worker(job: RenderJob, frames: range, path: Path, stamp: str) -> None:
+    if _WORKER_RENDERER is None:
+        raise RuntimeError("Render worker was not initialized")
+    _WORKER_RENDERER.reset()
+    partial = path.with_name(f"{path.stem}.partial{path.suffix}")
+    _encode_frames(_WORKER_RENDERER, job, frames, partial, workers=1)
+    partial.replace(path)
+    path.with_suffix(".done").write_text(stamp, encoding="utf-8")
+
+
+def _concat_segments(paths: list[Path], output_path: Path, work_dir: Path) -> None:
+    listing = work_dir / "concat.txt"
+    lines = []
+    for path in paths:
+        escaped = str(path.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    listing.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    command = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(listing),
+        "-c",
+        "copy",
+        str(output_path),
+    ]
+    completed = subprocess.run(command)
+    if completed.returncode != 0:
+        raise RuntimeError(f"ffmpeg concat failed with exit code {completed.returncode}")
+
+
+def _job_fingerprint(job: RenderJob) -> str:
+    payload = {
+        key: str(value)
+        for key, value in asdict(job).items()
+        if key not in ("output_path", "workers", "queue_depth", "cache_dir", "cache_max_bytes")
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8"))
+    digest.update(Path(job.scenario_path).read_bytes())
+    if job.trajectory_path is not None:
+        stat = Path(job.trajectory_path).stat()
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+class FramePipeline:
+    def __init__(
+        self,
+        stream,
+        frame_shape: tuple[int, ...],
+        depth: int = 4,
+        profile: RenderProfile | None = None,
+    ) -> None:
+        depth = max(depth, 1)
+        self._stream = stream
+        self._profile = profile
+        self._free: queue.Queue[np.ndarray] = queue.Queue()
+        for _ in range(depth):
+            self._free.put(np.empty(frame_shape, dtype=np.uint8))
+        self._pool_bytes = depth * int(np.prod(frame_shape))
+        if profile is not None:
+            profile.hold(self._pool_bytes)
+        self._ready: queue.Queue[np.ndarray | bytes | None] = queue.Queue(maxsize=depth)
+        self._error: BaseException | None = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def acquire(self) -> np.ndarray:
+        with timed(self._profile, "backpressure"):
+            while True:
+                self._raise_if_failed()
+                try:
+                    return self._free.get(timeout=_POLL_S)
+                except queue.Empty:
+                    continue
+
+    def submit(self, frame: np.ndarray | bytes | None) -> None:
+        if isinstance(frame, bytes) and self._profile is not None:
+            self._profile.hold(len(frame))
+        with timed(self._profile, "backpressure"):
+            while True:
+                self._raise_if_failed()
+                try:
+                    self._ready.put(frame, timeout=_POLL_S)
+                    return
+                except queue.Full:
+                    continue
+
+    def close(self) -> None:
+        self.submit(None)
+        self._thread.join()
+        self._raise_if_failed()
+
+    def abort(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        if self._profile is not None and self._pool_bytes:
+            self._profile.hold(-self._pool_bytes)
+            self._pool_bytes = 0
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Frame writer failed: {self._error}") from self._error
+
+    def _drain(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                frame = self._ready.get(timeout=_POLL_S)
+            except queue.Empty:
+                continue
+            if frame is None:
+                return
+            try:
+                with timed(self._profile, "ffmpeg_write"):
+                    self._stream.write(frame.data if isinstance(frame, np.ndarray) else frame)
+            except BaseException as exc:
+                self._error = exc
+                return
+            if self._profile is not None:
+                self._profile.piped(frame.nbytes if isinstance(frame, np.ndarray) else len(frame))
+                if isinstance(frame, bytes):
+                    self._profile.hold(-len(frame))
+            if isinstance(frame, np.ndarray):
+                self._free.put(frame)
+
+
+_POLL_S = 0.1
+_CACHE_VERSION = 2
+_BLOCK_FRAMES = 64
+_BLOCK_VALUES = 1 << 22
+_NO_BLOCK = np.zeros((0, 0, 3), dtype=np.float64)
+_WORKER_RENDERER: FrameRenderer | None = None
+
 
-    ffmpeg_cmd = [
+def _init_worker(renderer: FrameRenderer) -> None:
+    global _WORKER_RENDERER
+    if renderer.profile is not None:
+        renderer.profile = RenderProfile()
+    _WORKER_RENDERER = renderer
+
+
+def _render_in_worker(frame_index: int) -> tuple[bytes, dict[str, float]]:
+    if _WORKER_RENDERER is None:
+        raise RuntimeError("Render worker was not initialized")
+    frame = _WORKER_RENDERER.render_encoded(frame_index).tobytes(order="C")
+    profile = _WORKER_RENDERER.profile
+    return frame, profile.drain() if profile is not None else {}
+
+
+def _write_image_in_worker(frame_index: int, path: Path) -> None:
+    if _WORKER_RENDERER is None:
+        raise RuntimeError("Render worker was not initialized")
+    write_image(path, _WORKER_RENDERER.render(frame_index))
+
+
+def _ffmpeg_command(job: RenderJob, output_path: Path) -> list[str]:
+    return [
         "ffmpeg",
         "-y",
         "-f",
         "rawvideo",
         "-pixel_format",
-        "rgb24",
+        job.pixel_format,
         "-video_size",
         f"{job.width}x{job.height}",
         "-framerate",
@@ -57,46 +923,10 @@ def render_video(job: RenderJob) -> None:
         "-",
         "-c:v",
         "libx264",
+        *(["-preset", job.encoder_preset] if job.encoder_preset else []),
         "-pix_fmt",
         "yuv420p",
         "-b:v",
         job.bitrate,
-        str(job.output_path),
+        str(output_path),
     ]
-
-    process = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE)
-    if process.stdin is None:
-        raise RuntimeError("Failed to open ffmpeg stdin")
-
-    for frame_index in range(frame_count):
-        time_s = frame_index / job.fps
-        positions = sample_trajectory(trajectory, time_s)
-        bodies = [
-            RenderBody(
-                id=body_id,
-                position=tuple(positions[index]),
-                radius_px=6 if body_lookup.get(body_id, None) else 4,
-            )
-            for index, body_id in enumerate(body_ids)
-        ]
-        trails = None
-        if job.show_trails:
-            trails = _build_trails(trajectory, time_s)
-        camera = scenario.camera_track.evaluate(time_s)
-        frame = render_frame(bodies, camera, options, time_s=time_s, trails=trails)
-        process.stdin.write(frame.tobytes(order="C"))
-
-    process.stdin.close()
-    process.wait()
-    if process.returncode != 0:
-        raise RuntimeError(f"ffmpeg failed with exit code {process.returncode}")
-
-
-def _build_trails(trajectory, time_s: float) -> dict[str, list[tuple[float, float, float]]]:
-    trails: dict[str, list[tuple[float, float, float]]] = {bid: [] for bid in trajectory.body_ids}
-    for time_index, t in enumerate(trajectory.times):
-        if t > time_s:
-            break
-        for body_index, body_id in enumerate(trajectory.body_ids):
-            trails[body_id].append(tuple(trajectory.positions[time_index][body_index]))
-    return trails
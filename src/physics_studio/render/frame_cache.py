@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+class FrameCache:
+    def __init__(self, directory: Path, max_bytes: int | None = None) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.frame"
+
+    def load(self, key: str, out: np.ndarray) -> bool:
+        path = self.path(key)
+        try:
+            with path.open("rb") as handle:
+                if os.fstat(handle.fileno()).st_size != out.nbytes:
+                    self.misses += 1
+                    return False
+                if handle.readinto(memoryview(out).cast("B")) != out.nbytes:
+                    self.misses += 1
+                    return False
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        if self.max_bytes is not None:
+            os.utime(path)
+        self.hits += 1
+        return True
+
+    def store(self, key: str, frame: np.ndarray) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+        partial.write_bytes(np.ascontiguousarray(frame).data)
+        previous = 0
+        if self.max_bytes is not None and self._size is not None:
+            try:
+                previous = path.stat().st_size
+            except FileNotFoundError:
+                pass
+        partial.replace(path)
+        if self.max_bytes is None:
+            return
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._size += frame.nbytes - previous
+        if self._size > self.max_bytes:
+            self.evict(self.max_bytes)
+
+    def evict(self, max_bytes: int) -> None:
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort(key=lambda item: item[0])
+        size = sum(item[1] for item in entries)
+        for _, nbytes, entry in entries:
+            if size <= max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            size -= nbytes
+        self._size = size
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob("*/*.frame"))
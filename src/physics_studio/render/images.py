@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+IMAGE_FORMATS = ("png", "npy")
+
+
+def write_png(path: Path, rgb: np.ndarray, compress_level: int = 6) -> None:
+    height, width, channels = rgb.shape
+    if channels != 3 or rgb.dtype != np.uint8:
+        raise ValueError("PNG export expects an (H, W, 3) uint8 frame")
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    payload = b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", header),
+            _chunk(b"IDAT", zlib.compress(rows.tobytes(), compress_level)),
+            _chunk(b"IEND", b""),
+        ]
+    )
+    Path(path).write_bytes(payload)
+
+
+def read_png(path: Path) -> np.ndarray:
+    data = Path(path).read_bytes()
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"{path} is not a PNG file")
+    offset = 8
+    width = height = 0
+    compressed = bytearray()
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        kind = data[offset + 4 : offset + 8]
+        body = data[offset + 8 : offset + 8 + length]
+        offset += length + 12
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+            if (depth, color, interlace) != (8, 2, 0):
+                raise ValueError(f"{path} is not an 8-bit RGB PNG written by write_png")
+        elif kind == b"IDAT":
+            compressed.extend(body)
+    rows = np.frombuffer(zlib.decompress(bytes(compressed)), dtype=np.uint8)
+    rows = rows.reshape(height, width * 3 + 1)
+    if rows[:, 0].any():
+        raise ValueError(f"{path} uses PNG row filters that read_png does not decode")
+    return rows[:, 1:].reshape(height, width, 3).copy()
+
+
+def write_image(path: Path, rgb: np.ndarray) -> None:
+    suffix = Path(path).suffix
+    if suffix == ".png":
+        write_png(path, rgb)
+    elif suffix == ".npy":
+        np.save(path, rgb)
+    else:
+        raise ValueError(f"Unsupported image suffix: {suffix}")
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    crc = zlib.crc32(kind + body) & 0xFFFFFFFF
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", crc)
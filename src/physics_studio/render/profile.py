@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+STAGES = (
+    "simulate",
+    "camera",
+    "sample",
+    "trails",
+    "rasterize",
+    "convert",
+    "cache",
+    "backpressure",
+    "ffmpeg_write",
+    "ffmpeg_finish",
+)
+
+
+class RenderProfile:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.seconds = {stage: 0.0 for stage in STAGES}
+        self.frames = 0
+        self.bytes_piped = 0
+        self.buffer_bytes = 0
+        self.peak_buffer_bytes = 0
+        self.wall_s = 0.0
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def merge(self, seconds: dict[str, float]) -> None:
+        with self._lock:
+            for name, value in seconds.items():
+                self.seconds[name] = self.seconds.get(name, 0.0) + value
+
+    def drain(self) -> dict[str, float]:
+        with self._lock:
+            drained = {name: value for name, value in self.seconds.items() if value}
+            self.seconds = {stage: 0.0 for stage in STAGES}
+        return drained
+
+    def piped(self, nbytes: int) -> None:
+        with self._lock:
+            self.frames += 1
+            self.bytes_piped += nbytes
+
+    def hold(self, nbytes: int) -> None:
+        with self._lock:
+            self.buffer_bytes += nbytes
+            self.peak_buffer_bytes = max(self.peak_buffer_bytes, self.buffer_bytes)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "wall_s": self.wall_s,
+                "frames": self.frames,
+                "frames_per_s": self.frames / self.wall_s if self.wall_s > 0 else 0.0,
+                "bytes_piped": self.bytes_piped,
+                "peak_buffer_bytes": self.peak_buffer_bytes,
+                "stages_s": dict(self.seconds),
+            }
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"{summary['frames']} frames in {summary['wall_s']:.2f}s "
+            f"({summary['frames_per_s']:.1f} frames/s)",
+            f"piped {summary['bytes_piped'] / 1e6:.1f} MB, "
+            f"peak frame buffers {summary['peak_buffer_bytes'] / 1e6:.1f} MB",
+            f"{'stage':<14} {'seconds':>9} {'% wall':>7}",
+        ]
+        wall = summary["wall_s"] or 1.0
+        for name, seconds in summary["stages_s"].items():
+            lines.append(f"{name:<14} {seconds:>9.3f} {100.0 * seconds / wall:>6.1f}%")
+        return "\n".join(lines)
+
+    def write_json(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.summary(), indent=2) + "\n", encoding="utf-8")
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def timed(profile: RenderProfile | None, name: str) -> contextlib.AbstractContextManager:
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.stage(name)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import functools
 import hashlib
 import math
 from dataclasses import dataclass
 
 import numpy as np
 
+from physics_studio.core.run.lod import TrajectoryLod
+from physics_studio.render.camera import camera_bases
 from physics_studio.scenario.models import CameraState
 
 
@@ -16,6 +19,9 @@ class RenderBody:
     radius_px: int = 4
 
 
+RENDER_MODES = ("bodies", "density")
+
+
 @dataclass(frozen=True)
 class RenderOptions:
     width: int
@@ -23,6 +29,10 @@ class RenderOptions:
     show_timecode: bool = True
     show_labels: bool = True
     show_trails: bool = False
+    mode: str = "bodies"
+    density_exposure: float = 4.0
+    label_min_radius_px: int = 0
+    label_cell_px: int = 0
 
 
 _FONT = {
@@ -48,30 +58,18 @@ for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
         _FONT[ch] = ["111", "101", "111", "101", "101"]
 
 
+@functools.lru_cache(maxsize=65536)
 def _color_from_id(body_id: str) -> tuple[int, int, int]:
     digest = hashlib.sha256(body_id.encode("utf-8")).digest()
     return (digest[0], digest[1], digest[2])
 
 
-def _normalize(vec: np.ndarray) -> np.ndarray:
-    norm = np.linalg.norm(vec)
-    if norm == 0.0:
-        return vec
-    return vec / norm
-
-
 def _camera_basis(camera: CameraState) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    position = np.array(camera.position, dtype=np.float64)
-    target = np.array(camera.target, dtype=np.float64)
-    forward = _normalize(target - position)
-    if np.allclose(forward, 0.0):
-        forward = np.array([0.0, 0.0, -1.0], dtype=np.float64)
-    up_guess = np.array([0.0, 0.0, 1.0], dtype=np.float64)
-    right = _normalize(np.cross(forward, up_guess))
-    if np.allclose(right, 0.0):
-        right = np.array([1.0, 0.0, 0.0], dtype=np.float64)
-    up = _normalize(np.cross(right, forward))
-    return right, up, forward
+    right, up, forward = camera_bases(
+        np.array([camera.position], dtype=np.float64),
+        np.array([camera.target], dtype=np.float64),
+    )
+    return right[0], up[0], forward[0]
 
 
 def project_points(
@@ -79,13 +77,17 @@ def project_points(
     camera: CameraState,
     width: int,
     height: int,
+    view: np.ndarray | None = None,
 ) -> np.ndarray:
     position = np.array(camera.position, dtype=np.float64)
-    right, up, forward = _camera_basis(camera)
+    if view is None:
+        right, up, forward = _camera_basis(camera)
+    else:
+        right, up, forward = view[0, :3], view[1, :3], -view[2, :3]
     translated = positions - position
     x_cam = translated @ right
     y_cam = translated @ up
-    z_cam = translated @ (-forward)
+    z_cam = translated @ forward
     fov_rad = math.radians(camera.fov_deg)
     scale = 1.0 / math.tan(fov_rad * 0.5)
     z_cam = np.where(z_cam == 0.0, -1e-6, z_cam)
@@ -96,39 +98,85 @@ def project_points(
     return np.stack([x_pix, y_pix, z_cam], axis=1)
 
 
+def pixel_footprint(
+    positions: np.ndarray,
+    camera: CameraState,
+    height: int,
+    lod: TrajectoryLod | None = None,
+    time_s: float | None = None,
+) -> np.ndarray:
+    position = np.array(camera.position, dtype=np.float64)
+    _, _, forward = _camera_basis(camera)
+    depth = (positions - position) @ forward
+    if lod is not None:
+        # The history is drawn at one level, so size it by its nearest point, not the head.
+        coarse = lod.levels[-1]
+        stop = coarse.num_windows
+        if time_s is not None:
+            stop = int(np.searchsorted(coarse.times, time_s, side="right"))
+        if stop:
+            near = np.minimum(coarse.mins[:stop] * forward, coarse.maxs[:stop] * forward)
+            depth = np.minimum(depth, near.sum(axis=2).min(axis=0) - position @ forward)
+    depth = np.maximum(depth, 0.0)
+    view_height = 2.0 * math.tan(math.radians(camera.fov_deg) * 0.5)
+    return depth * view_height / max(height, 1)
+
+
+def build_lod_trails(
+    lod: TrajectoryLod,
+    body_ids: list[str],
+    positions: np.ndarray,
+    camera: CameraState,
+    height: int,
+    time_s: float,
+) -> dict[str, np.ndarray]:
+    levels = lod.select_levels(pixel_footprint(positions, camera, height, lod, time_s))
+    trails: dict[str, np.ndarray] = {}
+    for body_index, body_id in enumerate(body_ids):
+        level = lod.levels[int(levels[body_index])]
+        end = int(np.searchsorted(level.times, time_s, side="right"))
+        history = level.positions[:end, body_index]
+        trails[body_id] = np.concatenate([history, positions[body_index : body_index + 1]])
+    return trails
+
+
 def render_frame(
     bodies: list[RenderBody],
     camera: CameraState,
     options: RenderOptions,
     time_s: float | None = None,
-    trails: dict[str, list[tuple[float, float, float]]] | None = None,
+    trails: dict[str, list[tuple[float, float, float]] | np.ndarray] | None = None,
+    background: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+    view: np.ndarray | None = None,
 ) -> np.ndarray:
-    image = np.zeros((options.height, options.width, 3), dtype=np.uint8)
+    if background is not None:
+        image = background
+    elif out is not None:
+        image = out
+        image.fill(0)
+    else:
+        image = np.zeros((options.height, options.width, 3), dtype=np.uint8)
     if not bodies:
         return image
 
     positions = np.array([body.position for body in bodies], dtype=np.float64)
-    projected = project_points(positions, camera, options.width, options.height)
+    projected = project_points(positions, camera, options.width, options.height, view)
 
     if options.show_trails and trails:
+        polylines: list[np.ndarray] = []
+        colors: list[tuple[int, int, int]] = []
         for body in bodies:
             if body.id not in trails:
                 continue
             trail_positions = np.array(trails[body.id], dtype=np.float64)
-            trail_proj = project_points(trail_positions, camera, options.width, options.height)
-            color = _color_from_id(body.id)
-            for a, b in zip(trail_proj, trail_proj[1:]):
-                _draw_line(image, int(a[0]), int(a[1]), int(b[0]), int(b[1]), color)
+            polylines.append(
+                project_points(trail_positions, camera, options.width, options.height, view)
+            )
+            colors.append(_color_from_id(body.id))
+        draw_polylines(image, polylines, colors)
 
-    for body, proj in zip(bodies, projected):
-        if proj[2] <= 0:
-            continue
-        x = int(round(proj[0]))
-        y = int(round(proj[1]))
-        color = _color_from_id(body.id)
-        _draw_circle(image, x, y, body.radius_px, color)
-        if options.show_labels:
-            _draw_text(image, x + body.radius_px + 2, y - 6, body.id.upper(), color)
+    _stamp_bodies(image, bodies, projected, options)
 
     if options.show_timecode and time_s is not None:
         label = f"{time_s:0.2f}s"
@@ -137,59 +185,290 @@ def render_frame(
     return image
 
 
-def _draw_circle(image: np.ndarray, cx: int, cy: int, radius: int, color: tuple[int, int, int]) -> None:
-    height, width, _ = image.shape
-    for y in range(cy - radius, cy + radius + 1):
-        if y < 0 or y >= height:
-            continue
-        for x in range(cx - radius, cx + radius + 1):
-            if x < 0 or x >= width:
-                continue
-            if (x - cx) ** 2 + (y - cy) ** 2 <= radius ** 2:
-                image[y, x] = color
+_DENSITY_TINT = np.array([255.0, 214.0, 160.0], dtype=np.float64)
+
 
+@functools.lru_cache(maxsize=64)
+def _density_ramp(max_count: int, exposure: float) -> np.ndarray:
+    level = -np.expm1(-np.arange(max_count + 1, dtype=np.float64) / max(exposure, 1e-9))
+    ramp = np.rint(level[:, None] * _DENSITY_TINT).astype(np.uint8)
+    ramp.flags.writeable = False
+    return ramp
 
-def _draw_line(
-    image: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: tuple[int, int, int]
+
+def render_density_frame(
+    positions: np.ndarray,
+    camera: CameraState,
+    options: RenderOptions,
+    time_s: float | None = None,
+    out: np.ndarray | None = None,
+    view: np.ndarray | None = None,
+) -> np.ndarray:
+    width, height = options.width, options.height
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    elif out.shape != (height, width, 3) or out.dtype != np.uint8 or not out.flags.c_contiguous:
+        raise ValueError(f"Density frame needs a C-contiguous uint8 ({height}, {width}, 3) buffer")
+    counts = np.zeros(width * height, dtype=np.int64)
+    if len(positions):
+        projected = project_points(
+            np.asarray(positions, dtype=np.float64), camera, width, height, view
+        )
+        x = projected[:, 0]
+        y = projected[:, 1]
+        keep = (projected[:, 2] > 0) & (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        linear = y[keep].astype(np.int64) * width + x[keep].astype(np.int64)
+        counts = np.bincount(linear, minlength=width * height)
+    ramp = _density_ramp(int(counts.max(initial=0)), float(options.density_exposure))
+    np.take(ramp, counts, axis=0, out=out.reshape(-1, 3))
+
+    if options.show_timecode and time_s is not None:
+        _draw_text(out, 8, 8, f"{time_s:0.2f}s".upper(), (255, 255, 255))
+    return out
+
+
+_COORD_LIMIT = 1 << 30
+
+
+@functools.cache
+def _disk_offsets(radius: int) -> tuple[np.ndarray, np.ndarray]:
+    span = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(span, span, indexing="ij")
+    inside = dx * dx + dy * dy <= radius * radius
+    offsets = (dy[inside], dx[inside])
+    for array in offsets:
+        array.flags.writeable = False
+    return offsets
+
+
+@functools.cache
+def _text_offsets(text: str) -> tuple[np.ndarray, np.ndarray]:
+    rows: list[int] = []
+    cols: list[int] = []
+    fallback = _FONT.get("?", ["000", "000", "000", "000", "000"])
+    for index, ch in enumerate(text):
+        glyph = _FONT.get(ch, fallback)
+        for row, line in enumerate(glyph):
+            for col, bit in enumerate(line):
+                if bit == "1":
+                    rows.append(row)
+                    cols.append(index * 4 + col)
+    offsets = (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))
+    for array in offsets:
+        array.flags.writeable = False
+    return offsets
+
+
+def _stamp_bodies(
+    image: np.ndarray, bodies: list[RenderBody], projected: np.ndarray, options: RenderOptions
+) -> None:
+    height, width, _ = image.shape
+    front = np.flatnonzero((projected[:, 2] > 0) & np.isfinite(projected).all(axis=1))
+    if front.size == 0:
+        return
+    centers = np.clip(np.round(projected[front, :2]), -_COORD_LIMIT, _COORD_LIMIT)
+    cx = centers[:, 0].astype(np.int64)
+    cy = centers[:, 1].astype(np.int64)
+    radii = np.array([bodies[index].radius_px for index in front], dtype=np.int64)
+    on_screen = (cx + radii >= 0) & (cx - radii < width)
+    on_screen &= (cy + radii >= 0) & (cy - radii < height)
+
+    labeled = np.zeros(front.size, dtype=bool)
+    if options.show_labels:
+        candidates = radii >= options.label_min_radius_px
+        text_widths = np.array([len(bodies[index].id) * 4 for index in front], dtype=np.int64)
+        left = cx + radii + 2
+        top = cy - 6
+        labeled = (
+            candidates & (left < width) & (left + text_widths > 0) & (top < height) & (top + 5 > 0)
+        )
+
+    keep = np.flatnonzero(on_screen | labeled)
+    if keep.size == 0:
+        return
+    keep = keep[np.argsort(-projected[front[keep], 2], kind="stable")]
+    if options.label_cell_px > 0:
+        labeled = _declutter_labels(keep, labeled, cx, cy, options.label_cell_px, width, height)
+
+    visible = front[keep]
+    cx = cx[keep]
+    cy = cy[keep]
+    radii = radii[keep]
+    on_screen = on_screen[keep]
+    labeled = labeled[keep]
+    colors = np.array([_color_from_id(bodies[index].id) for index in visible], dtype=np.uint8)
+
+    ys: list[np.ndarray] = []
+    xs: list[np.ndarray] = []
+    owners: list[np.ndarray] = []
+    for radius in np.unique(radii[on_screen]).tolist():
+        group = np.flatnonzero(on_screen & (radii == radius))
+        dy, dx = _disk_offsets(radius)
+        ys.append((cy[group, None] + dy[None, :]).ravel())
+        xs.append((cx[group, None] + dx[None, :]).ravel())
+        owners.append(np.repeat(group * 2, dy.size))
+    for slot in np.flatnonzero(labeled).tolist():
+        rows, cols = _text_offsets(bodies[int(visible[slot])].id.upper())
+        ys.append(rows + (cy[slot] - 6))
+        xs.append(cols + (cx[slot] + radii[slot] + 2))
+        owners.append(np.full(rows.size, slot * 2 + 1, dtype=np.int64))
+    if not ys:
+        return
+
+    y = np.concatenate(ys)
+    x = np.concatenate(xs)
+    owner = np.concatenate(owners)
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    linear = y[inside] * width + x[inside]
+    owner = owner[inside]
+    if linear.size == 0:
+        return
+    order = np.lexsort((owner, linear))
+    linear = linear[order]
+    owner = owner[order]
+    last = np.ones(linear.size, dtype=bool)
+    last[:-1] = linear[1:] != linear[:-1]
+    image.reshape(-1, 3)[linear[last]] = colors[owner[last] // 2]
+
+
+def _declutter_labels(
+    order: np.ndarray,
+    labeled: np.ndarray,
+    cx: np.ndarray,
+    cy: np.ndarray,
+    cell_px: int,
+    width: int,
+    height: int,
+) -> np.ndarray:
+    nearest_first = order[::-1]
+    candidates = nearest_first[labeled[nearest_first]]
+    columns = width // cell_px + 1
+    column = np.clip(cx[candidates], 0, width - 1) // cell_px
+    row = np.clip(cy[candidates], 0, height - 1) // cell_px
+    cells = row * columns + column
+    _, first = np.unique(cells, return_index=True)
+    result = np.zeros_like(labeled)
+    result[candidates[first]] = True
+    return result
+
+
+def draw_segments(
+    image: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    colors: np.ndarray | tuple[int, int, int],
+) -> None:
+    height, width, _ = image.shape
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    colors = np.broadcast_to(np.asarray(colors, dtype=np.uint8), (starts.shape[0], 3))
+    keep, x0, y0, x1, y1 = _clip_segments(starts, ends, width, height)
+    if not keep.any():
+        return
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+    colors = colors[keep]
+
+    dx = x1 - x0
+    dy = y1 - y0
+    steps = np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64)
+    counts = steps + 1
+    segment = np.repeat(np.arange(counts.size), counts)
+    offsets = np.arange(segment.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = offsets / np.maximum(steps, 1)[segment]
+    x = np.floor(x0[segment] + dx[segment] * t).astype(np.int64)
+    y = np.floor(y0[segment] + dy[segment] * t).astype(np.int64)
+
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    linear = y[inside] * width + x[inside]
+    segment = segment[inside]
+    if linear.size == 0:
+        return
+    order = np.argsort(linear, kind="stable")
+    linear = linear[order]
+    segment = segment[order]
+    last = np.ones(linear.size, dtype=bool)
+    last[:-1] = linear[1:] != linear[:-1]
+    image.reshape(-1, 3)[linear[last]] = colors[segment[last]]
+
+
+def draw_polylines(
+    image: np.ndarray,
+    polylines: list[np.ndarray],
+    colors: list[tuple[int, int, int]],
 ) -> None:
-    dx = abs(x1 - x0)
-    dy = -abs(y1 - y0)
-    sx = 1 if x0 < x1 else -1
-    sy = 1 if y0 < y1 else -1
-    err = dx + dy
-    while True:
-        if 0 <= x0 < image.shape[1] and 0 <= y0 < image.shape[0]:
-            image[y0, x0] = color
-        if x0 == x1 and y0 == y1:
-            break
-        e2 = 2 * err
-        if e2 >= dy:
-            err += dy
-            x0 += sx
-        if e2 <= dx:
-            err += dx
-            y0 += sy
+    starts: list[np.ndarray] = []
+    ends: list[np.ndarray] = []
+    segment_colors: list[np.ndarray] = []
+    for points, color in zip(polylines, colors):
+        if len(points) < 2:
+            continue
+        segment_starts = points[:-1]
+        segment_ends = points[1:]
+        if points.shape[1] > 2:
+            front = (segment_starts[:, 2] > 0) & (segment_ends[:, 2] > 0)
+            segment_starts = segment_starts[front]
+            segment_ends = segment_ends[front]
+        starts.append(segment_starts[:, :2])
+        ends.append(segment_ends[:, :2])
+        segment_colors.append(np.tile(np.asarray(color, dtype=np.uint8), (len(segment_starts), 1)))
+    if starts:
+        draw_segments(
+            image, np.concatenate(starts), np.concatenate(ends), np.concatenate(segment_colors)
+        )
+
+
+def _clip_segments(
+    starts: np.ndarray, ends: np.ndarray, width: int, height: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    x0, y0 = starts[:, 0], starts[:, 1]
+    dx = ends[:, 0] - x0
+    dy = ends[:, 1] - y0
+    keep = np.isfinite(starts).all(axis=1) & np.isfinite(ends).all(axis=1)
+    t0 = np.zeros(x0.size)
+    t1 = np.ones(x0.size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in (
+            (-dx, x0),
+            (dx, width - x0),
+            (-dy, y0),
+            (dy, height - y0),
+        ):
+            ratio = q / p
+            t0 = np.where(p < 0, np.maximum(t0, ratio), t0)
+            t1 = np.where(p > 0, np.minimum(t1, ratio), t1)
+            keep &= ~((p == 0) & (q < 0))
+    keep &= t0 <= t1
+    return keep, x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy
 
 
 def _draw_text(
     image: np.ndarray, x: int, y: int, text: str, color: tuple[int, int, int]
 ) -> None:
-    cursor_x = x
-    for ch in text:
-        glyph = _FONT.get(ch, _FONT.get("?", ["000", "000", "000", "000", "000"]))
-        _draw_glyph(image, cursor_x, y, glyph, color)
-        cursor_x += 4
+    for index, ch in enumerate(text):
+        mask, sprite = _glyph_sprite(ch, color)
+        _blit(image, x + index * 4, y, mask, sprite)
 
 
-def _draw_glyph(
-    image: np.ndarray, x: int, y: int, glyph: list[str], color: tuple[int, int, int]
-) -> None:
+@functools.lru_cache(maxsize=4096)
+def _glyph_sprite(ch: str, color: tuple[int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+    glyph = _FONT.get(ch, _FONT.get("?", ["000", "000", "000", "000", "000"]))
+    mask = np.array([[bit == "1" for bit in line] for line in glyph], dtype=bool)
+    sprite = np.zeros(mask.shape + (3,), dtype=np.uint8)
+    sprite[mask] = color
+    mask = np.repeat(mask[:, :, None], 3, axis=2)
+    for array in (mask, sprite):
+        array.flags.writeable = False
+    return mask, sprite
+
+
+def _blit(image: np.ndarray, x: int, y: int, mask: np.ndarray, sprite: np.ndarray) -> None:
     height, width, _ = image.shape
-    for row, line in enumerate(glyph):
-        for col, bit in enumerate(line):
-            if bit != "1":
-                continue
-            px = x + col
-            py = y + row
-            if 0 <= px < width and 0 <= py < height:
-                image[py, px] = color
+    top = max(y, 0)
+    left = max(x, 0)
+    bottom = min(y + sprite.shape[0], height)
+    right = min(x + sprite.shape[1], width)
+    if top >= bottom or left >= right:
+        return
+    rows = slice(top - y, bottom - y)
+    cols = slice(left - x, right - x)
+    np.copyto(image[top:bottom, left:right], sprite[rows, cols], where=mask[rows, cols])
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
+import numpy as np
+
 from physics_studio.core.run.trajectory import Trajectory
 
+INTERPOLATION_METHODS = ("linear", "hermite")
+
 
-def sample_index(time_s: float, dt: float, sample_every: int, num_samples: int) -> int:
+def sample_index(
+    time_s: float,
+    dt: float,
+    sample_every: int,
+    num_samples: int,
+    times: np.ndarray | None = None,
+) -> int:
     if num_samples <= 0:
         return 0
     step = dt * max(sample_every, 1)
     if step <= 0:
         return 0
     raw_index = int(round(time_s / step))
-    return max(0, min(raw_index, num_samples - 1))
+    index = max(0, min(raw_index, num_samples - 1))
+    if times is None or index < num_samples - 2:
+        return index
+    # The final step is recorded even when it falls between sample_every
+    # strides, so the last interval can be shorter than the rest.
+    last = float(times[num_samples - 1])
+    previous = float(times[num_samples - 2]) if num_samples > 1 else last
+    return num_samples - 1 if time_s - previous > last - time_s else max(num_samples - 2, 0)
 
 
-def sample_trajectory(trajectory: Trajectory, time_s: float) -> list[list[float]]:
+def sample_trajectory(
+    trajectory: Trajectory, time_s: float, method: str = "linear"
+) -> list[list[float]]:
     times = trajectory.times
     if not times:
         return []
@@ -21,6 +40,9 @@ def sample_trajectory(trajectory: Trajectory, time_s: float) -> list[list[float]
         return trajectory.positions[0]
     if time_s >= times[-1]:
         return trajectory.positions[-1]
+    if method != "linear":
+        sampled = sample_trajectory_many(trajectory, np.array([time_s]), method=method)
+        return sampled[0].tolist()
 
     for idx in range(1, len(times)):
         if times[idx] >= time_s:
@@ -39,3 +61,133 @@ def sample_trajectory(trajectory: Trajectory, time_s: float) -> list[list[float]
                 )
             return interpolated
     return trajectory.positions[-1]
+
+
+def sample_trajectory_many(
+    trajectory: Trajectory, query_times: np.ndarray, method: str = "linear"
+) -> np.ndarray:
+    times, positions, velocities = trajectory.as_arrays()
+    return interpolate_positions(times, positions, velocities, query_times, method=method)
+
+
+def interpolate_positions(
+    times: np.ndarray,
+    positions: np.ndarray,
+    velocities: np.ndarray,
+    query_times: np.ndarray,
+    method: str = "linear",
+) -> np.ndarray:
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method: {method}")
+    query = np.asarray(query_times, dtype=np.float64).reshape(-1)
+    count = positions.shape[1] if positions.ndim == 3 else 0
+    if times.size == 0:
+        return np.zeros((query.size, count, 3), dtype=np.float64)
+    if times.size == 1:
+        return np.broadcast_to(positions[0], (query.size, count, 3)).copy()
+
+    left = np.searchsorted(times, query, side="right") - 1
+    left = np.clip(left, 0, times.size - 2)
+    right = left + 1
+    h = np.maximum(times[right] - times[left], 1e-9)
+    s = np.clip((query - times[left]) / h, 0.0, 1.0)
+
+    p0 = positions[left]
+    p1 = positions[right]
+    if method == "linear":
+        return p0 + (p1 - p0) * s[:, None, None]
+
+    s2 = s * s
+    s3 = s2 * s
+    h00 = 2.0 * s3 - 3.0 * s2 + 1.0
+    h10 = (s3 - 2.0 * s2 + s) * h
+    h01 = -2.0 * s3 + 3.0 * s2
+    h11 = (s3 - s2) * h
+    return (
+        h00[:, None, None] * p0
+        + h10[:, None, None] * velocities[left]
+        + h01[:, None, None] * p1
+        + h11[:, None, None] * velocities[right]
+    )
+
+
+CURSOR_METHODS = ("nearest",) + INTERPOLATION_METHODS
+_CURSOR_PROBE = 8
+
+
+class PlaybackCursor:
+    def __init__(self, trajectory: Trajectory, method: str = "linear") -> None:
+        if method not in CURSOR_METHODS:
+            raise ValueError(f"Unknown interpolation method: {method}")
+        self.body_ids = list(trajectory.body_ids)
+        self.method = method
+        self._times, self._positions, self._velocities = trajectory.as_arrays()
+        count = len(self.body_ids)
+        self._buffer = np.zeros((count, 3), dtype=np.float64)
+        self._scratch = np.zeros((count, 3), dtype=np.float64)
+        self._index = 0
+        self._time_s = 0.0
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def num_samples(self) -> int:
+        return int(self._times.size)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._buffer
+
+    def nearest_index(self) -> int:
+        times = self._times
+        idx = self._index
+        if idx + 1 < times.size and times[idx + 1] - self._time_s < self._time_s - times[idx]:
+            return idx + 1
+        return idx
+
+    def seek(self, time_s: float) -> np.ndarray:
+        times = self._times
+        count = times.size
+        self._time_s = float(time_s)
+        if count == 0:
+            return self._buffer
+
+        idx = self._index
+        if time_s < times[idx] or (
+            idx + _CURSOR_PROBE < count and times[idx + _CURSOR_PROBE] <= time_s
+        ):
+            idx = max(int(np.searchsorted(times, time_s, side="right")) - 1, 0)
+        else:
+            while idx + 1 < count and times[idx + 1] <= time_s:
+                idx += 1
+        self._index = idx
+
+        if self.method == "nearest":
+            np.copyto(self._buffer, self._positions[self.nearest_index()])
+            return self._buffer
+        if idx + 1 >= count or time_s <= times[idx]:
+            np.copyto(self._buffer, self._positions[idx])
+            return self._buffer
+
+        h = max(float(times[idx + 1] - times[idx]), 1e-9)
+        s = min((time_s - float(times[idx])) / h, 1.0)
+        p0 = self._positions[idx]
+        p1 = self._positions[idx + 1]
+        if self.method == "linear":
+            np.subtract(p1, p0, out=self._buffer)
+            self._buffer *= s
+            self._buffer += p0
+            return self._buffer
+
+        s2 = s * s
+        s3 = s2 * s
+        np.multiply(p0, 2.0 * s3 - 3.0 * s2 + 1.0, out=self._buffer)
+        np.multiply(p1, -2.0 * s3 + 3.0 * s2, out=self._scratch)
+        self._buffer += self._scratch
+        np.multiply(self._velocities[idx], (s3 - 2.0 * s2 + s) * h, out=self._scratch)
+        self._buffer += self._scratch
+        np.multiply(self._velocities[idx + 1], (s3 - s2) * h, out=self._scratch)
+        self._buffer += self._scratch
+        return self._buffer
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+
+from physics_studio.core.run.lod import TrajectoryLod, build_lod
+from physics_studio.render.renderer import (
+    _color_from_id,
+    draw_segments,
+    pixel_footprint,
+    project_points,
+)
+from physics_studio.scenario.models import CameraState
+
+
+class TrailLayer:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        body_ids: list[str],
+        times: np.ndarray,
+        positions: np.ndarray,
+        lod: TrajectoryLod | None = None,
+        max_age_s: float | None = None,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.body_ids = list(body_ids)
+        self.max_age_s = max_age_s
+        self._times = times
+        self._positions = positions
+        if lod is None:
+            lod = build_lod(times, positions, min_windows=times.size)
+        self._lod = lod
+        self._strides = np.array([level.stride for level in lod.levels], dtype=np.int64)
+        self._colors = np.array(
+            [_color_from_id(body_id) for body_id in self.body_ids], dtype=np.uint8
+        ).reshape(-1, 3)
+        self._raster = np.zeros((height, width, 3), dtype=np.uint8)
+        self._view: np.ndarray | None = None
+        self._camera: CameraState | None = None
+        self._start = 0
+        self._levels = np.zeros(len(self.body_ids), dtype=np.int64)
+        self._drawn = np.zeros(len(self.body_ids), dtype=np.int64)
+        self._end = -1
+
+    def render(
+        self,
+        camera: CameraState,
+        time_s: float,
+        head_positions: np.ndarray | None = None,
+        out: np.ndarray | None = None,
+        view: np.ndarray | None = None,
+    ) -> np.ndarray:
+        self.update(camera, time_s, view)
+        if out is None:
+            image = self._raster.copy()
+        else:
+            image = out
+            np.copyto(image, self._raster)
+        if self._end >= 0:
+            self._draw_tails(image, camera, head_positions)
+        return image
+
+    def update(
+        self, camera: CameraState, time_s: float, view: np.ndarray | None = None
+    ) -> np.ndarray:
+        self._view = view
+        end = int(np.searchsorted(self._times, time_s, side="right")) - 1
+        start = 0
+        levels = np.zeros(len(self.body_ids), dtype=np.int64)
+        if end >= 0 and self.max_age_s is not None:
+            start = int(np.searchsorted(self._times, time_s - self.max_age_s, side="left"))
+            start = min(start, end)
+        elif end >= 0 and len(self._lod.levels) > 1:
+            footprint = pixel_footprint(
+                self._positions[end], camera, self.height, self._lod, float(self._times[end])
+            )
+            levels = self._lod.select_levels(footprint)
+        counts = end // self._strides[levels] + 1 if end >= 0 else np.zeros_like(levels)
+        if (
+            camera != self._camera
+            or start != self._start
+            or not np.array_equal(levels, self._levels)
+            or (counts < self._drawn).any()
+        ):
+            self._raster.fill(0)
+            self._camera = camera
+            self._start = start
+            self._levels = levels
+            self._drawn = np.full_like(levels, start)
+        self._draw_history(camera, counts)
+        self._drawn = counts
+        self._end = end
+        return self._raster
+
+    def _draw_history(self, camera: CameraState, counts: np.ndarray) -> None:
+        paths: list[tuple[np.ndarray, np.ndarray]] = []
+        for body_index, level_index in enumerate(self._levels):
+            level = self._lod.levels[int(level_index)]
+            first = max(int(self._drawn[body_index]) - 1, self._start)
+            stop = int(counts[body_index])
+            paths.append(
+                (
+                    level.positions[first:stop, body_index],
+                    np.arange(first, max(stop, first)) * level.stride,
+                )
+            )
+        self._draw_paths(self._raster, camera, paths)
+
+    def _draw_tails(
+        self, image: np.ndarray, camera: CameraState, head_positions: np.ndarray | None
+    ) -> None:
+        paths: list[tuple[np.ndarray, np.ndarray]] = []
+        for body_index, level_index in enumerate(self._levels):
+            stride = int(self._strides[level_index])
+            first = max((int(self._drawn[body_index]) - 1) * stride, self._start)
+            points = self._positions[first : self._end + 1, body_index]
+            order = np.arange(first, self._end + 1)
+            if head_positions is not None:
+                points = np.concatenate([points, head_positions[body_index : body_index + 1]])
+                order = np.append(order, self._end + 1)
+            paths.append((points, order))
+        self._draw_paths(image, camera, paths)
+
+    def _draw_paths(
+        self, image: np.ndarray, camera: CameraState, paths: list[tuple[np.ndarray, np.ndarray]]
+    ) -> None:
+        # Segments are painted in sample order across bodies, so where trails cross the
+        # later one wins no matter how many frames the layer was built over.
+        lengths = [len(points) for points, _ in paths]
+        if max(lengths, default=0) < 2:
+            return
+        projected = project_points(
+            np.concatenate([points for points, _ in paths]),
+            camera,
+            self.width,
+            self.height,
+            self._view,
+        )
+        front = projected[:, 2] > 0
+        keep = np.zeros(len(projected), dtype=bool)
+        keys: list[np.ndarray] = []
+        bodies: list[np.ndarray] = []
+        offset = 0
+        for body_index, (_, order) in enumerate(paths):
+            count = len(order)
+            if count >= 2:
+                span = slice(offset, offset + count - 1)
+                keep[span] = front[span] & front[offset + 1 : offset + count]
+                keys.append(order[1:][keep[span]])
+                bodies.append(np.full(int(keep[span].sum()), body_index))
+            offset += count
+        starts = projected[:-1][keep[:-1], :2]
+        ends = projected[1:][keep[:-1], :2]
+        sequence = np.argsort(np.concatenate(keys), kind="stable")
+        colors = self._colors[np.concatenate(bodies)]
+        draw_segments(image, starts[sequence], ends[sequence], colors[sequence])
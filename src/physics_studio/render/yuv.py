@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+PIXEL_FORMATS = ("rgb24", "yuv420p")
+
+_LUMA = np.array([66.0, 129.0, 25.0], dtype=np.float32)
+_CHROMA = np.array([[-38.0, 112.0], [-74.0, -94.0], [112.0, -18.0]], dtype=np.float32)
+
+
+def frame_shape(pixel_format: str, width: int, height: int) -> tuple[int, ...]:
+    if pixel_format == "rgb24":
+        return (height, width, 3)
+    if pixel_format == "yuv420p":
+        return (width * height * 3 // 2,)
+    raise ValueError(f"Unsupported pixel format: {pixel_format}")
+
+
+class Yuv420Converter:
+    def __init__(self, width: int, height: int) -> None:
+        if width % 2 or height % 2:
+            raise ValueError("yuv420p output needs an even frame width and height")
+        self.width = width
+        self.height = height
+        pixels = width * height
+        self._rgb = np.empty((pixels, 3), dtype=np.float32)
+        self._luma = np.empty(pixels, dtype=np.float32)
+        self._sub = np.empty((height // 2, width // 2, 3), dtype=np.float32)
+        self._chroma = np.empty((pixels // 4, 2), dtype=np.float32)
+
+    def convert(self, rgb: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        width, height = self.width, self.height
+        pixels = width * height
+        quarter = pixels // 4
+        if out is None:
+            out = np.empty(pixels * 3 // 2, dtype=np.uint8)
+
+        np.copyto(self._rgb, rgb.reshape(pixels, 3))
+        np.matmul(self._rgb, _LUMA, out=self._luma)
+        self._luma += 128.0 + 16.0 * 256.0
+        self._luma *= 1.0 / 256.0
+        np.floor(self._luma, out=self._luma)
+        np.copyto(out[:pixels], self._luma, casting="unsafe")
+
+        blocks = self._rgb.reshape(height // 2, 2, width // 2, 2, 3)
+        np.add(blocks[:, 0, :, 0], blocks[:, 0, :, 1], out=self._sub)
+        self._sub += blocks[:, 1, :, 0]
+        self._sub += blocks[:, 1, :, 1]
+        self._sub += 2.0
+        self._sub *= 0.25
+        np.floor(self._sub, out=self._sub)
+        np.matmul(self._sub.reshape(quarter, 3), _CHROMA, out=self._chroma)
+        self._chroma += 128.0 + 128.0 * 256.0
+        self._chroma *= 1.0 / 256.0
+        np.floor(self._chroma, out=self._chroma)
+        np.copyto(out[pixels : pixels + quarter], self._chroma[:, 0], casting="unsafe")
+        np.copyto(out[pixels + quarter :], self._chroma[:, 1], casting="unsafe")
+        return out
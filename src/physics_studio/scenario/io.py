@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import json
+import struct
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+
 from physics_studio.scenario.migrations.registry import upgrade_to_latest
 from physics_studio.scenario.models import Scenario
 from physics_studio.scenario.schema import SCHEMA_VERSION, validate_scenario_dict
@@ -23,6 +27,101 @@ def save_scenario(scenario: Scenario, path: str | Path) -> None:
     path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
 
 
+BINARY_TRAJECTORY_SUFFIX = ".trajbin"
+_BINARY_MAGIC = b"PSTRAJ01"
+
+
+@dataclass(frozen=True)
+class TrajectoryFile:
+    header: dict
+    body_ids: list[str]
+    times: np.ndarray
+    positions: np.ndarray
+    velocities: np.ndarray
+
+    @property
+    def num_samples(self) -> int:
+        return int(self.times.shape[0])
+
+
 def save_trajectory(trajectory: dict, path: str | Path) -> None:
     path = Path(path)
+    if path.suffix == BINARY_TRAJECTORY_SUFFIX:
+        _save_trajectory_binary(trajectory, path)
+        return
     path.write_text(json.dumps(trajectory, indent=2), encoding="utf-8")
+
+
+def load_trajectory_file(path: str | Path) -> TrajectoryFile:
+    path = Path(path)
+    with path.open("rb") as handle:
+        is_binary = handle.read(len(_BINARY_MAGIC)) == _BINARY_MAGIC
+    if is_binary:
+        return _load_trajectory_binary(path)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    channels = data.pop("channels", {})
+    body_ids = [str(body["id"]) for body in data.get("bodies", [])]
+    count = len(body_ids)
+    times = np.asarray(channels.get("time_s", []), dtype=np.float64)
+    positions = np.asarray(channels.get("position_m", []), dtype=np.float64)
+    velocities = np.asarray(channels.get("velocity_mps", []), dtype=np.float64)
+    if "hashes" in channels:
+        data["hashes"] = channels["hashes"]
+    return TrajectoryFile(
+        header=data,
+        body_ids=body_ids,
+        times=times,
+        positions=positions.reshape(times.size, count, 3),
+        velocities=velocities.reshape(times.size, count, 3),
+    )
+
+
+def _save_trajectory_binary(trajectory: dict, path: Path) -> None:
+    header = {key: value for key, value in trajectory.items() if key != "channels"}
+    channels = trajectory.get("channels", {})
+    count = len(header.get("bodies", []))
+    times = np.ascontiguousarray(channels.get("time_s", []), dtype="<f8")
+    positions = np.ascontiguousarray(channels.get("position_m", []), dtype="<f8")
+    velocities = np.ascontiguousarray(channels.get("velocity_mps", []), dtype="<f8")
+    if "hashes" in channels:
+        header["hashes"] = list(channels["hashes"])
+    header["binary"] = {"num_samples": int(times.size), "num_bodies": count, "dtype": "<f8"}
+    encoded = json.dumps(header, sort_keys=True).encode("utf-8")
+    encoded += b" " * (-(len(_BINARY_MAGIC) + 8 + len(encoded)) % 8)
+    with path.open("wb") as handle:
+        handle.write(_BINARY_MAGIC)
+        handle.write(struct.pack("<Q", len(encoded)))
+        handle.write(encoded)
+        handle.write(times.tobytes())
+        handle.write(positions.reshape(times.size, count, 3).tobytes())
+        handle.write(velocities.reshape(times.size, count, 3).tobytes())
+
+
+def _load_trajectory_binary(path: Path) -> TrajectoryFile:
+    with path.open("rb") as handle:
+        handle.seek(len(_BINARY_MAGIC))
+        (header_len,) = struct.unpack("<Q", handle.read(8))
+        header = json.loads(handle.read(header_len).decode("utf-8"))
+    layout = header.pop("binary")
+    samples = int(layout["num_samples"])
+    count = int(layout["num_bodies"])
+    offset = len(_BINARY_MAGIC) + 8 + header_len
+    times = _map_channel(path, offset, (samples,))
+    offset += samples * 8
+    channel_shape = (samples, count, 3)
+    positions = _map_channel(path, offset, channel_shape)
+    offset += samples * count * 3 * 8
+    velocities = _map_channel(path, offset, channel_shape)
+    return TrajectoryFile(
+        header=header,
+        body_ids=[str(body["id"]) for body in header.get("bodies", [])],
+        times=times,
+        positions=positions,
+        velocities=velocities,
+    )
+
+
+def _map_channel(path: Path, offset: int, shape: tuple[int, ...]) -> np.ndarray:
+    if 0 in shape:
+        return np.zeros(shape, dtype="<f8")
+    return np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=shape)
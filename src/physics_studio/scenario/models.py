@@ -43,13 +43,16 @@ class ScenarioSettings:
             "drag_coefficient": self.drag_coefficient,
         }
 
-    def to_simulation_config(self, record_hashes: bool = False) -> SimulationConfig:
+    def to_simulation_config(
+        self, record_hashes: bool = False, sample_every: int = 1
+    ) -> SimulationConfig:
         return SimulationConfig(
             dt=self.dt,
             steps=self.steps,
             gravity=GravitySettings(G=self.gravity_constant, softening=self.gravity_softening),
             drag_coefficient=self.drag_coefficient,
             record_hashes=record_hashes,
+            sample_every=sample_every,
         )
 
 
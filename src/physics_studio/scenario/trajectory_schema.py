@@ -4,6 +4,7 @@ import hashlib
 from datetime import datetime, timezone
 from pathlib import Path
 
+from physics_studio.core.determinism.hashing import HashCheckpoint
 from physics_studio.core.run.config import SimulationConfig
 from physics_studio.core.run.trajectory import Trajectory
 from physics_studio.scenario.models import Scenario
@@ -28,6 +29,7 @@ def build_trajectory_schema_v1(
     integrator: str,
     sample_every: int,
     hashes: list[str] | None = None,
+    checkpoints: list[HashCheckpoint] | None = None,
     include_created_utc: bool = False,
 ) -> dict:
     bodies_by_id = {body.id: body for body in scenario.particles + scenario.rigid_bodies}
@@ -66,6 +68,16 @@ def build_trajectory_schema_v1(
     if hashes is not None:
         payload["channels"]["hashes"] = list(hashes)
 
+    if hashes is not None or checkpoints is not None:
+        if config.hash_every != 1 or config.hash_algorithm != "sha256":
+            payload["simulation"]["hash_every"] = config.hash_every
+            payload["simulation"]["hash_algorithm"] = config.hash_algorithm
+
+    if checkpoints is not None:
+        payload["hash_checkpoints"] = [
+            {"step": checkpoint.step_index, "root": checkpoint.root} for checkpoint in checkpoints
+        ]
+
     if include_created_utc:
         created_utc = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
         payload["created_utc"] = created_utc
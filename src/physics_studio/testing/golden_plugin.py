@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from physics_studio.cli.verify import VerifyResult, collect_scenarios, verify_scenario
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("golden", "Physics Studio golden hash checks")
+    group.addoption(
+        "--golden-scenarios",
+        action="append",
+        default=[],
+        help="Scenario file or directory to verify (default: examples/scenarios)",
+    )
+    group.addoption(
+        "--golden-dir", default=None, help="Golden hash directory (default: examples/golden)"
+    )
+    group.addoption("--golden-update", action="store_true", help="Rewrite golden hash files")
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "golden_scenario" not in metafunc.fixturenames:
+        return
+    config = metafunc.config
+    paths = config.getoption("golden_scenarios") or [
+        str(config.rootpath / "examples" / "scenarios")
+    ]
+    scenarios = collect_scenarios([Path(path) for path in paths])
+    metafunc.parametrize("golden_scenario", scenarios, ids=[path.stem for path in scenarios])
+
+
+@pytest.fixture
+def golden_dir(request: pytest.FixtureRequest) -> Path:
+    option = request.config.getoption("golden_dir")
+    if option:
+        return Path(option)
+    return request.config.rootpath / "examples" / "golden"
+
+
+@pytest.fixture
+def golden_result(
+    golden_scenario: Path, golden_dir: Path, request: pytest.FixtureRequest
+) -> VerifyResult:
+    return verify_scenario(
+        golden_scenario, golden_dir, update=request.config.getoption("golden_update")
+    )
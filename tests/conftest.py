@@ -0,0 +1 @@
+pytest_plugins = ["physics_studio.testing.golden_plugin"]
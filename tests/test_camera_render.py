@@ -2,8 +2,21 @@ from __future__ import annotations
 
 import hashlib
 
+import numpy as np
+
+from physics_studio.render.camera import compile_camera_track
 from physics_studio.render.renderer import RenderBody, RenderOptions, render_frame
-from physics_studio.scenario.models import CameraKeyframe, CameraTrack
+from physics_studio.scenario.models import CameraKeyframe, CameraState, CameraTrack
+
+
+def _reference_basis(camera: CameraState) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    position = np.array(camera.position, dtype=np.float64)
+    forward = np.array(camera.target, dtype=np.float64) - position
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, (0.0, 0.0, 1.0))
+    right = right / np.linalg.norm(right) if np.linalg.norm(right) > 1e-12 else np.eye(3)[0]
+    up = np.cross(right, forward)
+    return right, up / np.linalg.norm(up), forward
 
 
 def test_camera_interpolation_midpoint() -> None:
@@ -32,3 +45,39 @@ def test_render_frame_determinism() -> None:
     hash_a = hashlib.sha256(frame_a.tobytes()).hexdigest()
     hash_b = hashlib.sha256(frame_b.tobytes()).hexdigest()
     assert hash_a == hash_b
+
+
+def test_compiled_camera_track_matches_evaluate() -> None:
+    track = CameraTrack(
+        keyframes=[
+            CameraKeyframe(time_s=4.0, position=(3.0, 1.0, 9.0), target=(0.0, 1.0, 0.0)),
+            CameraKeyframe(
+                time_s=0.0, position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=50.0
+            ),
+            CameraKeyframe(
+                time_s=1.5, position=(2.0, -1.0, 7.0), target=(1.0, 0.0, 0.0), fov_deg=80.0
+            ),
+        ],
+        default_fov_deg=65.0,
+    )
+    times = np.array([-1.0, 0.0, 0.3, 1.5, 2.2, 4.0, 6.0])
+    frames = compile_camera_track(track).evaluate_many(times)
+
+    assert np.allclose(
+        frames.views[1],
+        [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, -10.0], [0.0, 0.0, 0.0, 1.0]],
+    )
+    for index, time_s in enumerate(times.tolist()):
+        expected = track.evaluate(time_s)
+        assert frames.state(index) == expected
+        right, up, forward = _reference_basis(expected)
+        position = np.array(expected.position)
+        assert np.allclose(frames.views[index, 0, :3], right, rtol=0.0, atol=1e-12)
+        assert np.allclose(frames.views[index, 1, :3], up, rtol=0.0, atol=1e-12)
+        assert np.allclose(frames.views[index, 2, :3], -forward, rtol=0.0, atol=1e-12)
+        assert np.allclose(
+            frames.views[index, :3, 3],
+            [-right @ position, -up @ position, forward @ position],
+            rtol=0.0,
+            atol=1e-12,
+        )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from physics_studio.cli.compare import EXIT_MISMATCH, EXIT_OK, EXIT_TOLERANCE, compare_trajectories
+from physics_studio.core.run.simulator import run_simulation
+from physics_studio.scenario.io import load_scenario, load_trajectory_file, save_trajectory
+from physics_studio.scenario.trajectory_schema import build_trajectory_schema_v1
+
+
+def _payload(delta_v: float = 0.0) -> dict:
+    scenario_path = (
+        Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    )
+    scenario = load_scenario(scenario_path)
+    config = scenario.settings.to_simulation_config(record_hashes=True)
+    result = run_simulation(scenario.to_system_state(), scenario.events, config)
+    payload = build_trajectory_schema_v1(
+        trajectory=result.trajectory,
+        scenario=scenario,
+        config=config,
+        scenario_path=str(scenario_path),
+        content_hash="test",
+        integrator="semi_implicit_euler",
+        sample_every=1,
+        hashes=result.hashes,
+    )
+    if delta_v:
+        for sample in payload["channels"]["velocity_mps"][50:]:
+            sample[1][0] += delta_v
+        for index, sample in enumerate(payload["channels"]["position_m"][51:], start=1):
+            sample[1][0] += delta_v * 10.0 * index
+    return payload
+
+
+def test_binary_round_trip_matches_json(tmp_path: Path) -> None:
+    payload = _payload()
+    save_trajectory(payload, tmp_path / "a.json")
+    save_trajectory(payload, tmp_path / "a.trajbin")
+    from_json = load_trajectory_file(tmp_path / "a.json")
+    from_binary = load_trajectory_file(tmp_path / "a.trajbin")
+    assert from_binary.body_ids == from_json.body_ids
+    assert from_binary.header["hashes"] == payload["channels"]["hashes"]
+    assert np.array_equal(from_binary.positions, from_json.positions)
+    assert np.array_equal(from_binary.velocities, from_json.velocities)
+
+    report = compare_trajectories(from_json, from_binary, position_tolerance=0.0, chunk_size=7)
+    assert report.exit_code == EXIT_OK
+    assert all(body.position_max == 0.0 for body in report.bodies)
+
+
+def test_compare_reports_first_exceedance(tmp_path: Path) -> None:
+    save_trajectory(_payload(), tmp_path / "golden.trajbin")
+    save_trajectory(_payload(delta_v=0.5), tmp_path / "run.json")
+    golden = load_trajectory_file(tmp_path / "golden.trajbin")
+    run = load_trajectory_file(tmp_path / "run.json")
+
+    report = compare_trajectories(
+        golden, run, position_tolerance=1.0, velocity_tolerance=0.1, chunk_size=16
+    )
+    assert report.exit_code == EXIT_TOLERANCE
+    assert report.first_exceedance.sample_index == 50
+    assert report.first_exceedance.channel == "velocity"
+    assert report.first_exceedance.body_id == "satellite"
+    satellite = next(body for body in report.bodies if body.body_id == "satellite")
+    assert np.isclose(satellite.velocity_max, 0.5)
+    assert report.bodies[0].position_max == 0.0
+
+    position_only = compare_trajectories(golden, run, position_tolerance=1.0)
+    assert position_only.first_exceedance.sample_index == 51
+    assert position_only.first_exceedance.channel == "position"
+
+
+def test_compare_detects_shape_mismatch(tmp_path: Path) -> None:
+    payload = _payload()
+    save_trajectory(payload, tmp_path / "full.json")
+    for key in ("time_s", "position_m", "velocity_mps"):
+        payload["channels"][key] = payload["channels"][key][:10]
+    save_trajectory(payload, tmp_path / "short.trajbin")
+    report = compare_trajectories(
+        load_trajectory_file(tmp_path / "full.json"),
+        load_trajectory_file(tmp_path / "short.trajbin"),
+        position_tolerance=0.0,
+    )
+    assert report.exit_code == EXIT_MISMATCH
+
+
+def test_compare_counts_nan_errors_as_exceedances(tmp_path: Path) -> None:
+    save_trajectory(_payload(), tmp_path / "golden.trajbin")
+    payload = _payload()
+    payload["channels"]["position_m"][30][1][0] = float("nan")
+    save_trajectory(payload, tmp_path / "run.trajbin")
+
+    report = compare_trajectories(
+        load_trajectory_file(tmp_path / "golden.trajbin"),
+        load_trajectory_file(tmp_path / "run.trajbin"),
+        position_tolerance=1.0,
+        chunk_size=16,
+    )
+    assert report.exit_code == EXIT_TOLERANCE
+    assert report.first_exceedance.sample_index == 30
+    assert report.first_exceedance.body_id == "satellite"
+
+
+def test_compare_fails_when_sample_times_differ(tmp_path: Path) -> None:
+    save_trajectory(_payload(), tmp_path / "golden.trajbin")
+    payload = _payload()
+    for index in range(40, len(payload["channels"]["time_s"])):
+        payload["channels"]["time_s"][index] += 0.5
+    save_trajectory(payload, tmp_path / "run.trajbin")
+    golden = load_trajectory_file(tmp_path / "golden.trajbin")
+    run = load_trajectory_file(tmp_path / "run.trajbin")
+
+    report = compare_trajectories(golden, run, position_tolerance=1.0, chunk_size=16)
+    assert report.exit_code == EXIT_MISMATCH
+    assert "sample 40" in report.mismatch
+    assert report.max_time_error == 0.5
+
+    relaxed = compare_trajectories(golden, run, position_tolerance=1.0, time_tolerance=1.0)
+    assert relaxed.exit_code == EXIT_OK
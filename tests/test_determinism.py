@@ -1,7 +1,12 @@
 ﻿from __future__ import annotations
 
+import hashlib
+from dataclasses import replace
 from pathlib import Path
 
+import numpy as np
+
+from physics_studio.core.determinism.hashing import hash_state
 from physics_studio.core.run.simulator import run_simulation
 from physics_studio.scenario.io import load_scenario
 from physics_studio.scenario.trajectory_schema import (
@@ -11,7 +16,9 @@ from physics_studio.scenario.trajectory_schema import (
 
 
 def test_deterministic_hashes() -> None:
-    scenario_path = Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    scenario_path = (
+        Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    )
     scenario = load_scenario(scenario_path)
     config = scenario.settings.to_simulation_config(record_hashes=True)
 
@@ -41,3 +48,36 @@ def test_deterministic_hashes() -> None:
     assert len(payload["channels"]["time_s"]) == config.steps + 1
     assert len(payload["channels"]["position_m"]) == config.steps + 1
     assert len(payload["channels"]["position_m"][0]) == len(payload["bodies"])
+
+
+def test_fast_hash_path_matches_legacy_sha256() -> None:
+    positions = np.arange(12, dtype=np.float64).reshape(4, 3) * 0.5
+    velocities = np.arange(12, dtype=np.float64).reshape(4, 3)[::-1]
+    legacy = hashlib.sha256()
+    legacy.update((7).to_bytes(8, byteorder="little", signed=False))
+    legacy.update(positions.astype(np.float64).tobytes(order="C"))
+    legacy.update(velocities.astype(np.float64).tobytes(order="C"))
+    assert hash_state(7, positions, velocities) == legacy.hexdigest()
+    assert hash_state(7, positions.astype(np.float32), velocities) == legacy.hexdigest()
+    assert len(hash_state(7, positions, velocities, algorithm="crc32")) == 8
+    assert len(hash_state(7, positions, velocities, algorithm="adler32")) == 8
+
+
+def test_hash_cadence_and_algorithm() -> None:
+    scenario_path = (
+        Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    )
+    scenario = load_scenario(scenario_path)
+    full = scenario.settings.to_simulation_config(record_hashes=True)
+    sparse = replace(full, hash_every=7, hash_algorithm="crc32")
+
+    full_hashes = run_simulation(scenario.to_system_state(), scenario.events, full).hashes
+    sparse_hashes = run_simulation(scenario.to_system_state(), scenario.events, sparse).hashes
+    assert len(sparse_hashes) == len(range(0, full.steps + 1, 7)) + 1
+    assert sparse_hashes == run_simulation(
+        scenario.to_system_state(), scenario.events, sparse
+    ).hashes
+    strided = run_simulation(
+        scenario.to_system_state(), scenario.events, replace(full, hash_every=7)
+    ).hashes
+    assert strided == full_hashes[::7] + [full_hashes[-1]]
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from physics_studio.core.run.simulator import run_simulation
+from physics_studio.render import export
+from physics_studio.render.export import (
+    ExportCancelled,
+    FramePipeline,
+    RenderJob,
+    RenderTarget,
+    iter_frames,
+    plan_segments,
+    prepare_frame_renderer,
+    proxy_job,
+    render_image_sequence,
+    render_segmented,
+    render_video,
+    segment_dir,
+)
+from physics_studio.render.frame_cache import FrameCache
+from physics_studio.render.images import read_png
+from physics_studio.render.profile import RenderProfile
+from physics_studio.scenario.io import load_scenario, save_trajectory
+from physics_studio.scenario.trajectory_schema import (
+    build_trajectory_schema_v1,
+    compute_content_hash,
+)
+
+SCENARIO = Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+
+
+def _job(**overrides) -> RenderJob:
+    values = dict(
+        scenario_path=SCENARIO,
+        output_path=Path("unused.mp4"),
+        duration_s=0.5,
+        fps=24,
+        width=96,
+        height=64,
+        bitrate="1M",
+        show_trails=True,
+        trail_seconds=0.25,
+        sample_every=10,
+    )
+    values.update(overrides)
+    return RenderJob(**values)
+
+
+def _copy_stdin_command(job: RenderJob, path: Path) -> list[str]:
+    script = "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], 'wb'))"
+    return [sys.executable, "-c", script, str(path)]
+
+
+def test_parallel_frames_are_byte_identical_and_ordered() -> None:
+    renderer = prepare_frame_renderer(_job())
+    serial = list(iter_frames(renderer, range(12), workers=1))
+    parallel = list(iter_frames(renderer, range(12), workers=2))
+
+    assert len(set(serial)) > 1
+    assert parallel == serial
+
+
+def test_unlimited_trails_render_in_parallel() -> None:
+    job = _job(trail_seconds=None, duration_s=1.0)
+    serial = list(iter_frames(prepare_frame_renderer(job), range(24), workers=1))
+    renderer = prepare_frame_renderer(job)
+
+    assert list(iter_frames(renderer, range(24), workers=3)) == serial
+    assert renderer._trail_layer is None
+
+
+def test_pipeline_reuses_buffers_and_preserves_frames() -> None:
+    renderer = prepare_frame_renderer(_job(trail_seconds=None))
+    expected = b"".join(iter_frames(renderer, range(10)))
+
+    stream = io.BytesIO()
+    pipeline = FramePipeline(stream, (64, 96, 3), depth=2)
+    renderer = prepare_frame_renderer(_job(trail_seconds=None))
+    seen: set[int] = set()
+    for frame_index in range(10):
+        buffer = pipeline.acquire()
+        seen.add(id(buffer))
+        renderer.render(frame_index, out=buffer)
+        pipeline.submit(buffer)
+    pipeline.close()
+
+    assert len(seen) <= 2
+    assert stream.getvalue() == expected
+
+
+def test_segment_plan_covers_timeline_and_resumes(tmp_path, monkeypatch) -> None:
+    plan = plan_segments(range(100), 3)
+    assert [(frames.start, frames.stop) for frames in plan] == [(0, 33), (33, 66), (66, 100)]
+
+    job = _job(output_path=tmp_path / "out.mp4")
+    work_dir = segment_dir(job.output_path)
+    work_dir.mkdir()
+    frame_count = int(round(job.duration_s * job.fps))
+    fingerprint = export._job_fingerprint(job)
+    for index, frames in enumerate(plan_segments(range(frame_count), 2)):
+        path = work_dir / f"segment_{index:04d}.mp4"
+        path.write_bytes(b"segment")
+        path.with_suffix(".done").write_text(
+            f"{fingerprint}:{frames.start}:{frames.stop}", encoding="utf-8"
+        )
+    joined: list[list[Path]] = []
+    monkeypatch.setattr(export, "_concat_segments", lambda paths, *_: joined.append(paths))
+
+    results = render_segmented(job, 2, keep_segments=True)
+
+    assert all(result.resumed for result in results)
+    assert joined == [[work_dir / "segment_0000.mp4", work_dir / "segment_0001.mp4"]]
+
+
+def test_failed_segment_keeps_markers_for_the_others(tmp_path, monkeypatch) -> None:
+    fail = "import sys; sys.stdin.buffer.read(); sys.exit(1)"
+    failing = ["segment_0000"]
+
+    def command(job, path):
+        if path.name.startswith(tuple(failing)):
+            return [sys.executable, "-c", fail, str(path)]
+        return _copy_stdin_command(job, path)
+
+    monkeypatch.setattr(export, "_ffmpeg_command", command)
+    monkeypatch.setattr(export, "_concat_segments", lambda *_: None)
+    job = _job(output_path=tmp_path / "out.mp4", workers=2)
+    work_dir = segment_dir(job.output_path)
+
+    with pytest.raises(RuntimeError, match="ffmpeg failed"):
+        render_segmented(job, 3)
+
+    assert not (work_dir / "segment_0000.done").exists()
+    assert (work_dir / "segment_0001.done").exists()
+    assert (work_dir / "segment_0002.done").exists()
+
+    failing.clear()
+    results = render_segmented(job, 3, keep_segments=True)
+    assert [result.resumed for result in results] == [False, True, True]
+
+
+def test_render_from_saved_trajectory_matches_resimulation(tmp_path) -> None:
+    scenario = load_scenario(SCENARIO)
+    config = scenario.settings.to_simulation_config(sample_every=10)
+    result = run_simulation(scenario.to_system_state(), scenario.events, config)
+    payload = build_trajectory_schema_v1(
+        trajectory=result.trajectory,
+        scenario=scenario,
+        config=config,
+        scenario_path=str(SCENARIO),
+        content_hash=compute_content_hash(SCENARIO),
+        integrator="semi_implicit_euler",
+        sample_every=10,
+    )
+    saved = tmp_path / "orbit.trajbin"
+    save_trajectory(payload, saved)
+
+    simulated = prepare_frame_renderer(_job())
+    loaded = prepare_frame_renderer(_job(trajectory_path=saved))
+    assert list(iter_frames(loaded, range(6))) == list(iter_frames(simulated, range(6)))
+
+    assert isinstance(loaded.sample_positions, np.memmap)
+    payload = pickle.dumps(loaded)
+    assert b"LodLevel" not in payload
+    restored = pickle.loads(payload)
+    assert restored.lod.levels[0].positions is restored.sample_positions
+    assert list(iter_frames(restored, range(6))) == list(iter_frames(simulated, range(6)))
+
+    edited = tmp_path / "edited.json"
+    edited.write_text(SCENARIO.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="different scenario"):
+        prepare_frame_renderer(_job(scenario_path=edited, trajectory_path=saved))
+
+
+def test_yuv420_frames_halve_bytes_and_match_across_workers() -> None:
+    renderer = prepare_frame_renderer(_job(pixel_format="yuv420p"))
+    serial = list(iter_frames(renderer, range(4), workers=1))
+
+    assert all(len(frame) == 96 * 64 * 3 // 2 for frame in serial)
+    assert list(iter_frames(renderer, range(4), workers=2)) == serial
+
+
+def test_frame_range_writes_image_sequence_matching_full_render(tmp_path) -> None:
+    full = prepare_frame_renderer(_job(trail_seconds=None))
+    expected = [full.render(frame_index) for frame_index in range(10)][4:9]
+
+    job = _job(
+        trail_seconds=None,
+        output_path=tmp_path / "frames",
+        output_format="png",
+        start_frame=4,
+        end_frame=9,
+    )
+    paths = render_image_sequence(job)
+
+    assert [path.name for path in paths] == [f"frame_{index:06d}.png" for index in range(4, 9)]
+    for path, frame in zip(paths, expected, strict=True):
+        assert (read_png(path) == frame).all()
+    with pytest.raises(ValueError, match="selects no frames"):
+        render_image_sequence(replace(job, start_frame=40, end_frame=None))
+
+
+def test_frame_cache_reuses_frames_until_the_camera_changes(tmp_path) -> None:
+    keyframes = [
+        {"time_s": 0.0, "position_xyz": [0.0, 0.0, 10.0], "target_xyz": [0.0, 0.0, 0.0]},
+        {"time_s": 0.25, "position_xyz": [2.0, 0.0, 10.0], "target_xyz": [0.0, 0.0, 0.0]},
+    ]
+    data = json.loads(SCENARIO.read_text(encoding="utf-8"))
+    data["camera"] = {"keyframes": keyframes}
+    first = tmp_path / "first.json"
+    first.write_text(json.dumps(data), encoding="utf-8")
+    data["camera"]["keyframes"].append(
+        {"time_s": 0.4, "position_xyz": [0.0, 4.0, 10.0], "target_xyz": [0.0, 0.0, 0.0]}
+    )
+    second = tmp_path / "second.json"
+    second.write_text(json.dumps(data), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+
+    uncached = list(iter_frames(prepare_frame_renderer(_job(scenario_path=first)), range(12)))
+    renderer = prepare_frame_renderer(_job(scenario_path=first, cache_dir=cache_dir))
+    assert list(iter_frames(renderer, range(12))) == uncached
+    assert (renderer._cache.hits, renderer._cache.misses) == (0, 12)
+
+    edited = prepare_frame_renderer(_job(scenario_path=second, cache_dir=cache_dir))
+    expected = list(iter_frames(prepare_frame_renderer(_job(scenario_path=second)), range(12)))
+    assert list(iter_frames(edited, range(12))) == expected
+    assert (edited._cache.hits, edited._cache.misses) == (7, 5)
+
+
+def test_cached_frames_skip_unlimited_trails(tmp_path) -> None:
+    job = _job(trail_seconds=None, cache_dir=tmp_path / "cache")
+    uncached = list(iter_frames(prepare_frame_renderer(replace(job, cache_dir=None)), range(12)))
+    warm = prepare_frame_renderer(job)
+    assert list(iter_frames(warm, range(6))) == uncached[:6]
+
+    renderer = prepare_frame_renderer(job)
+    assert list(iter_frames(renderer, range(6))) == uncached[:6]
+    assert renderer._trail_layer is None
+    assert list(iter_frames(renderer, range(6, 12))) == uncached[6:]
+    assert (renderer._cache.hits, renderer._cache.misses) == (6, 6)
+
+
+def test_frame_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = FrameCache(tmp_path, max_bytes=2 * 12)
+    frames = {key: np.full(12, index, dtype=np.uint8) for index, key in enumerate("abc")}
+    cache.store("aa", frames["a"])
+    cache.store("bb", frames["b"])
+    os.utime(cache.path("aa"), ns=(1_000_000_000, 1_000_000_000))
+    os.utime(cache.path("bb"), ns=(2_000_000_000, 2_000_000_000))
+    assert cache.load("aa", np.empty(12, dtype=np.uint8))
+    cache.store("cc", frames["c"])
+
+    assert cache.path("aa").exists()
+    assert not cache.path("bb").exists()
+    assert cache.path("cc").exists()
+
+
+def test_frame_cache_counts_overwritten_entries_once(tmp_path) -> None:
+    cache = FrameCache(tmp_path, max_bytes=3 * 12)
+    frame = np.zeros(12, dtype=np.uint8)
+    for _ in range(3):
+        cache.store("aa", frame)
+    assert cache._size == 12
+
+    cache.store("bb", frame)
+    assert cache._size == 24
+
+
+def test_multiple_outputs_share_one_simulation(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(export, "_ffmpeg_command", _copy_stdin_command)
+    simulations: list[int] = []
+
+    def counting_simulation(*args, **kwargs):
+        simulations.append(1)
+        return run_simulation(*args, **kwargs)
+
+    monkeypatch.setattr(export, "run_simulation", counting_simulation)
+    targets = [
+        RenderTarget(tmp_path / "small.mp4", width=48, height=32, fps=24, bitrate="1M"),
+        RenderTarget(tmp_path / "large.mp4", width=96, height=64, fps=24, bitrate="2M"),
+        RenderTarget(tmp_path / "fast.mp4", width=48, height=32, fps=48, bitrate="1M"),
+    ]
+    render_video(_job(), targets)
+
+    assert len(simulations) == 1
+    monkeypatch.setattr(export, "run_simulation", run_simulation)
+    for target in targets:
+        target_job = target.apply(_job())
+        renderer = prepare_frame_renderer(target_job)
+        expected = b"".join(iter_frames(renderer, range(int(0.5 * target.fps))))
+        assert target.output_path.read_bytes() == expected
+
+
+def test_proxy_job_is_small_fast_and_unlabeled() -> None:
+    job = _job(width=3840, height=2160, fps=30, start_frame=30, end_frame=45)
+    proxy = proxy_job(job)
+
+    assert (proxy.width, proxy.height, proxy.fps) == (960, 540, 15)
+    assert (proxy.start_frame, proxy.end_frame) == (15, 23)
+    assert not proxy.show_trails and not proxy.show_labels
+    command = export._ffmpeg_command(proxy, Path("out.mp4"))
+    assert command[command.index("-preset") + 1] == "ultrafast"
+    assert "-preset" not in export._ffmpeg_command(job, Path("out.mp4"))
+
+
+def test_profile_counts_frames_bytes_and_stages(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(export, "_ffmpeg_command", _copy_stdin_command)
+    profile = RenderProfile()
+    job = _job(output_path=tmp_path / "out.mp4", pixel_format="yuv420p", workers=2)
+    render_video(job, profile=profile)
+
+    summary = profile.summary()
+    assert summary["frames"] == 12
+    assert summary["bytes_piped"] == job.output_path.stat().st_size == 12 * 96 * 64 * 3 // 2
+    assert summary["peak_buffer_bytes"] >= job.queue_depth * 96 * 64 * 3 // 2
+    assert profile.buffer_bytes == 0
+    for stage in ("simulate", "camera", "sample", "trails", "rasterize", "convert"):
+        assert summary["stages_s"][stage] > 0.0
+    profile.write_json(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["frames"] == 12
+
+
+def test_cancel_stops_ffmpeg_and_removes_partial_output(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(export, "_ffmpeg_command", _copy_stdin_command)
+    cancel = threading.Event()
+    reported: list[tuple[int, int]] = []
+
+    def progress(done: int, total: int) -> None:
+        reported.append((done, total))
+        if done == 3:
+            cancel.set()
+
+    job = _job(output_path=tmp_path / "out.mp4", workers=2)
+    with pytest.raises(ExportCancelled):
+        render_video(job, progress=progress, cancel=cancel)
+
+    assert reported == [(1, 12), (2, 12), (3, 12)]
+    assert not job.output_path.exists()
+
+
+def test_cancel_during_simulation_skips_encoding(tmp_path, monkeypatch) -> None:
+    launched: list[Path] = []
+    monkeypatch.setattr(export, "_ffmpeg_command", lambda job, path: launched.append(path))
+    cancel = threading.Event()
+
+    def cancelling_simulation(*args, **kwargs):
+        cancel.set()
+        return run_simulation(*args, **kwargs)
+
+    monkeypatch.setattr(export, "run_simulation", cancelling_simulation)
+    job = _job(output_path=tmp_path / "out.mp4")
+    with pytest.raises(ExportCancelled):
+        render_video(job, cancel=cancel)
+    small = RenderTarget(tmp_path / "small.mp4", width=48, height=32, fps=24, bitrate="1M")
+    with pytest.raises(ExportCancelled):
+        render_video(job, [small], cancel=cancel)
+
+    assert launched == []
+    assert not job.output_path.exists()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from physics_studio.cli.verify import VerifyResult, golden_path, verify_all, verify_scenario
+
+
+def test_example_scenarios_match_golden_hashes(golden_result: VerifyResult) -> None:
+    assert golden_result.ok, golden_result.message
+
+
+def test_verify_stops_at_first_mismatch(tmp_path: Path) -> None:
+    examples = Path(__file__).resolve().parents[1] / "examples" / "scenarios"
+    scenario_path = examples / "two_body_orbit.json"
+    assert verify_scenario(scenario_path, tmp_path, update=True, checkpoint_every=20).ok
+
+    target = golden_path(tmp_path, scenario_path)
+    golden = json.loads(target.read_text(encoding="utf-8"))
+    golden["checkpoints"][3]["root"] = "0" * 64
+    target.write_text(json.dumps(golden), encoding="utf-8")
+
+    result = verify_scenario(scenario_path, tmp_path)
+    assert result.status == "mismatch"
+    assert result.step_index == 60
+
+    missing = examples / "thrust_impulse_demo.json"
+    results = verify_all([scenario_path, missing], tmp_path, workers=1)
+    assert [item.status for item in results] == ["mismatch"]
+
+
+def test_parallel_verify_keeps_scenario_order(tmp_path: Path) -> None:
+    examples = Path(__file__).resolve().parents[1] / "examples" / "scenarios"
+    scenarios = sorted(examples.glob("*.json"))
+    updated = verify_all(scenarios, tmp_path, workers=2, update=True, checkpoint_every=50)
+    assert [item.status for item in updated] == ["updated"] * len(scenarios)
+    assert golden_path(tmp_path, scenarios[0]).read_text(encoding="utf-8").endswith("}\n")
+
+    golden_path(tmp_path, scenarios[0]).unlink()
+    results = verify_all(scenarios, tmp_path, workers=2, fail_fast=False)
+    assert [item.scenario for item in results] == [path.name for path in scenarios]
+    assert [item.status for item in results] == ["missing"] + ["ok"] * (len(scenarios) - 1)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+from physics_studio.core.determinism.bisect import find_divergent_body, find_divergent_checkpoint
+from physics_studio.core.events.models import ImpulseEvent
+from physics_studio.core.run.simulator import replay_window, run_simulation
+from physics_studio.scenario.io import load_scenario
+
+
+def _scenario():
+    path = Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    return load_scenario(path)
+
+
+def test_chained_checkpoints_are_deterministic() -> None:
+    scenario = _scenario()
+    config = replace(
+        scenario.settings.to_simulation_config(record_hashes=True),
+        hash_mode="chain",
+        checkpoint_every=16,
+    )
+    result_a = run_simulation(scenario.to_system_state(), scenario.events, config)
+    result_b = run_simulation(scenario.to_system_state(), scenario.events, config)
+    assert result_a.hashes == []
+    assert [c.step_index for c in result_a.checkpoints][-2:] == [192, 200]
+    assert [c.root for c in result_a.checkpoints] == [c.root for c in result_b.checkpoints]
+    assert find_divergent_checkpoint(result_a.checkpoints, result_b.checkpoints) is None
+
+
+def test_bisect_then_replay_finds_divergent_body() -> None:
+    scenario = _scenario()
+    config = replace(
+        scenario.settings.to_simulation_config(record_hashes=True),
+        hash_mode="chain",
+        checkpoint_every=8,
+    )
+    kick = ImpulseEvent(id="kick", time=1370.0, body_id="satellite", delta_v=(0.0, 1e-9, 0.0))
+    events_b = scenario.events + [kick]
+    state = scenario.to_system_state()
+    result_a = run_simulation(state, scenario.events, config)
+    result_b = run_simulation(state, events_b, config)
+
+    divergence = find_divergent_checkpoint(result_a.checkpoints, result_b.checkpoints)
+    assert divergence is not None
+    assert divergence.last_match.step_index == 136
+    assert divergence.first_mismatch.step_index == 144
+    assert divergence.comparisons <= 5
+
+    start = divergence.last_match
+    stop = divergence.first_mismatch.step_index
+    window_a = replay_window(state, scenario.events, config, start, stop)
+    window_b = replay_window(state, events_b, config, start, stop)
+    body = find_divergent_body(result_a.trajectory.body_ids, start.step_index, window_a, window_b)
+    assert body is not None
+    assert body.step_index == 138
+    assert body.body_ids == ["satellite"]
+
+
+def test_replay_from_initial_state_when_first_checkpoint_diverges() -> None:
+    scenario = _scenario()
+    config = replace(
+        scenario.settings.to_simulation_config(record_hashes=True),
+        hash_mode="chain",
+        checkpoint_every=8,
+    )
+    state_a = scenario.to_system_state()
+    moved = replace(state_a.particles[-1], velocity=(0.0, 0.0, 1e-9))
+    state_b = replace(state_a, particles=state_a.particles[:-1] + (moved,))
+    result_a = run_simulation(state_a, scenario.events, config)
+    result_b = run_simulation(state_b, scenario.events, config)
+
+    divergence = find_divergent_checkpoint(result_a.checkpoints, result_b.checkpoints)
+    assert divergence is not None
+    assert divergence.last_match is None
+    assert divergence.first_mismatch.step_index == 0
+
+    window_a = replay_window(state_a, scenario.events, config, None, 0)
+    window_b = replay_window(state_b, scenario.events, config, None, 0)
+    body = find_divergent_body(result_a.trajectory.body_ids, 0, window_a, window_b)
+    assert body is not None
+    assert body.step_index == 0
+    assert body.body_ids == [moved.id]
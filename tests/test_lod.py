@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+
+from physics_studio.core.run.lod import build_lod
+from physics_studio.render.renderer import build_lod_trails
+from physics_studio.scenario.models import CameraState
+
+
+def _spiral(samples: int) -> tuple[np.ndarray, np.ndarray]:
+    times = np.arange(samples, dtype=np.float64)
+    angle = times * 0.01
+    positions = np.stack([np.cos(angle) * 10.0, np.sin(angle) * 10.0, np.zeros_like(angle)], axis=1)
+    return times, positions[:, None, :]
+
+
+def test_lod_levels_bound_every_sample() -> None:
+    times, positions = _spiral(1000)
+    lod = build_lod(times, positions, factor=4)
+    assert lod.levels[0].num_windows == 1000
+    assert [level.stride for level in lod.levels] == [1, 4, 16, 64, 256]
+    for level in lod.levels[1:]:
+        for window in range(level.num_windows):
+            chunk = positions[window * level.stride : (window + 1) * level.stride, 0]
+            assert np.all(level.mins[window, 0] <= chunk.min(axis=0))
+            assert np.all(level.maxs[window, 0] >= chunk.max(axis=0))
+        assert level.times[0] == 0.0
+    extents = [float(level.extent[0]) for level in lod.levels]
+    assert extents == sorted(extents)
+    assert lod.level_for_columns(100).stride == 4
+    assert lod.level_for_columns(5000).stride == 1
+
+
+def test_lod_trails_coarsen_with_distance() -> None:
+    times, positions = _spiral(1000)
+    lod = build_lod(times, positions)
+    current = positions[-1]
+    near = CameraState(position=(0.0, 0.0, 15.0), target=(0.0, 0.0, 0.0), fov_deg=60.0)
+    far = CameraState(position=(0.0, 0.0, 5000.0), target=(0.0, 0.0, 0.0), fov_deg=60.0)
+    near_trail = build_lod_trails(lod, ["a"], current, near, 720, 999.0)["a"]
+    far_trail = build_lod_trails(lod, ["a"], current, far, 720, 999.0)["a"]
+    assert len(far_trail) < len(near_trail) <= 1001
+    assert np.array_equal(far_trail[0], positions[0, 0])
+    assert np.array_equal(far_trail[-1], current[0])
+
+
+def test_lod_trails_size_history_by_its_nearest_point() -> None:
+    times, positions = _spiral(1000)
+    positions = positions * 0.1
+    positions[900:, 0, 2] = -1000.0
+    lod = build_lod(times, positions)
+    camera = CameraState(position=(0.0, 0.0, 15.0), target=(0.0, 0.0, 0.0), fov_deg=90.0)
+    trail = build_lod_trails(lod, ["a"], positions[-1], camera, 1, 999.0)["a"]
+    assert len(trail) > 1000 // 16
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from physics_studio.render.renderer import (
+    RenderBody,
+    RenderOptions,
+    _color_from_id,
+    _declutter_labels,
+    _draw_text,
+    draw_segments,
+    project_points,
+    render_density_frame,
+    render_frame,
+)
+from physics_studio.scenario.models import CameraState
+
+
+def _reference_frame(bodies, camera, options) -> np.ndarray:
+    image = np.zeros((options.height, options.width, 3), dtype=np.uint8)
+    positions = np.array([body.position for body in bodies], dtype=np.float64)
+    projected = project_points(positions, camera, options.width, options.height)
+    far_to_near = sorted(range(len(bodies)), key=lambda index: -projected[index, 2])
+    for body, proj in ((bodies[index], projected[index]) for index in far_to_near):
+        if proj[2] <= 0:
+            continue
+        cx = int(round(proj[0]))
+        cy = int(round(proj[1]))
+        color = _color_from_id(body.id)
+        radius = body.radius_px
+        for y in range(cy - radius, cy + radius + 1):
+            for x in range(cx - radius, cx + radius + 1):
+                inside = 0 <= x < options.width and 0 <= y < options.height
+                if inside and (x - cx) ** 2 + (y - cy) ** 2 <= radius**2:
+                    image[y, x] = color
+        if options.show_labels:
+            _draw_text(image, cx + radius + 2, cy - 6, body.id.upper(), color)
+    return image
+
+
+def test_stamped_bodies_are_pixel_identical_to_reference() -> None:
+    rng = np.random.default_rng(3)
+    bodies = [
+        RenderBody(
+            id=f"b{index}_x",
+            position=tuple(rng.uniform(-6.0, 6.0, size=3)),
+            radius_px=int(rng.choice([0, 2, 4, 6])),
+        )
+        for index in range(120)
+    ]
+    bodies.append(RenderBody(id="culled", position=(0.0, 0.0, 30.0), radius_px=6))
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+    for show_labels in (False, True):
+        options = RenderOptions(width=96, height=64, show_timecode=False, show_labels=show_labels)
+        expected = _reference_frame(bodies, camera, options)
+        assert expected.any()
+        assert np.array_equal(render_frame(bodies, camera, options), expected)
+
+
+def test_batch_segments_rasterize_and_clip() -> None:
+    image = np.zeros((20, 30, 3), dtype=np.uint8)
+    starts = np.array([[2.0, 3.0], [5.0, 0.0], [15.0, 0.0], [-1e12, 10.0], [40.0, 40.0]])
+    ends = np.array([[12.0, 3.0], [5.0, 6.0], [24.0, 9.0], [1e12, 10.0], [50.0, 45.0]])
+    colors = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255], [9, 9, 9], [7, 7, 7]])
+
+    draw_segments(image, starts, ends, colors)
+
+    assert (np.delete(image[3, 2:13], 3, axis=0) == (255, 0, 0)).all()
+    assert (image[0:7, 5] == (0, 255, 0)).all()
+    assert all((image[i, 15 + i] == (0, 0, 255)).all() for i in range(10))
+    assert (image[10] == (9, 9, 9)).all()
+    assert not (image == 7).all(axis=2).any()
+    assert (image[3, 5] == (0, 255, 0)).all()
+
+
+def test_text_sprites_match_font_bitmaps_when_clipped() -> None:
+    from physics_studio.render.renderer import _FONT
+
+    for x, y in ((2, 2), (-3, -2), (18, 16)):
+        image = np.zeros((20, 24, 3), dtype=np.uint8)
+        _draw_text(image, x, y, "12.5S", (10, 20, 30))
+        expected = np.zeros_like(image)
+        for index, ch in enumerate("12.5S"):
+            for row, line in enumerate(_FONT[ch]):
+                for col, bit in enumerate(line):
+                    px, py = x + index * 4 + col, y + row
+                    if bit == "1" and 0 <= px < 24 and 0 <= py < 20:
+                        expected[py, px] = (10, 20, 30)
+        assert np.array_equal(image, expected)
+
+
+def test_density_frame_accumulates_bodies_per_pixel() -> None:
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+    options = RenderOptions(width=40, height=30, show_timecode=False, mode="density")
+    positions = np.array([[0.0, 0.0, 0.0]] * 9 + [[1.5, 1.0, 0.0], [0.0, 0.0, 50.0]])
+
+    image = render_density_frame(positions, camera, options)
+
+    projected = project_points(positions, camera, 40, 30)
+    dense = projected[0, :2].astype(int)
+    single = projected[9, :2].astype(int)
+    assert image[dense[1], dense[0], 0] > image[single[1], single[0], 0] > 0
+    assert np.count_nonzero(image.any(axis=2)) == 2
+
+    tint = np.array([255.0, 214.0, 160.0])
+    for pixel, count in ((dense, 9), (single, 1)):
+        expected = np.rint(tint * (1.0 - math.exp(-count / options.density_exposure)))
+        assert np.array_equal(image[pixel[1], pixel[0]], expected.astype(np.uint8))
+
+    buffer = np.full((30, 40, 3), 7, dtype=np.uint8)
+    assert render_density_frame(positions, camera, options, out=buffer) is buffer
+    assert np.array_equal(buffer, image)
+    for bad in (np.zeros((30, 80, 3), dtype=np.uint8)[:, ::2], np.zeros((40, 30, 3), np.uint8)):
+        with pytest.raises(ValueError):
+            render_density_frame(positions, camera, options, out=bad)
+
+
+def test_nearer_bodies_draw_last_and_labels_declutter() -> None:
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+    near = RenderBody(id="near", position=(0.0, 0.0, 5.0), radius_px=3)
+    far = RenderBody(id="far", position=(0.0, 0.0, -5.0), radius_px=6)
+    options = RenderOptions(width=64, height=48, show_timecode=False, show_labels=False)
+    for bodies in ([near, far], [far, near]):
+        image = render_frame(bodies, camera, options)
+        assert tuple(image[24, 32]) == _color_from_id("near")
+        assert tuple(image[24, 32 + 5]) == _color_from_id("far")
+
+    full = render_frame([far, near], camera, replace(options, show_labels=True))
+    decluttered = render_frame(
+        [far, near], camera, replace(options, show_labels=True, label_cell_px=64)
+    )
+    far_color = np.array(_color_from_id("far"), dtype=np.uint8)
+    assert (full == far_color).all(axis=2).sum() > (decluttered == far_color).all(axis=2).sum()
+
+
+def test_label_cells_clamp_offscreen_centers() -> None:
+    order = np.array([0, 1])
+    labeled = np.array([True, True])
+    cx = np.array([-1, 59])
+    cy = np.array([16, 0])
+    kept = _declutter_labels(order, labeled, cx, cy, 16, 60, 40)
+    assert kept.tolist() == [True, True]
@@ -2,8 +2,17 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import numpy as np
+
 from physics_studio.core.run.simulator import run_simulation
-from physics_studio.render.sampling import sample_index
+from physics_studio.core.run.trajectory import Trajectory
+from physics_studio.render.sampling import (
+    PlaybackCursor,
+    interpolate_positions,
+    sample_index,
+    sample_trajectory,
+    sample_trajectory_many,
+)
 from physics_studio.scenario.io import load_scenario
 
 
@@ -18,6 +27,14 @@ def test_sample_index_clamping() -> None:
     assert idx_under == 0
 
 
+def test_sample_index_uses_recorded_final_step() -> None:
+    times = np.array([0.0, 2.0, 4.0, 5.0])
+    assert sample_index(3.0, dt=1.0, sample_every=2, num_samples=4) == 2
+    assert sample_index(4.4, dt=1.0, sample_every=2, num_samples=4, times=times) == 2
+    assert sample_index(4.6, dt=1.0, sample_every=2, num_samples=4, times=times) == 3
+    assert sample_index(9.0, dt=1.0, sample_every=2, num_samples=4, times=times) == 3
+
+
 def test_simulated_position_differs_from_initial() -> None:
     scenario_path = Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "toy_two_body_orbit.json"
     scenario = load_scenario(scenario_path)
@@ -29,3 +46,88 @@ def test_simulated_position_differs_from_initial() -> None:
     initial_pos = next(body.position for body in scenario.particles if body.id == "orbiter")
     final_pos = tuple(trajectory.positions[idx][orbiter_index])
     assert final_pos != initial_pos
+
+
+def test_hermite_matches_cubic_motion_exactly() -> None:
+    times = np.array([0.0, 2.0, 4.0])
+    positions = np.array([[[t**3, 0.0, 1.0]] for t in times])
+    velocities = np.array([[[3.0 * t**2, 0.0, 0.0]] for t in times])
+    query = np.array([0.5, 1.0, 3.3])
+    sampled = interpolate_positions(times, positions, velocities, query, method="hermite")
+    assert sampled.shape == (3, 1, 3)
+    assert np.allclose(sampled[:, 0, 0], query**3)
+    assert np.allclose(sampled[:, 0, 2], 1.0)
+
+
+def test_sparse_hermite_beats_linear() -> None:
+    scenario_path = (
+        Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    )
+    scenario = load_scenario(scenario_path)
+    settings = scenario.settings
+    dense_config = settings.to_simulation_config(record_hashes=False)
+    sparse_config = settings.to_simulation_config(record_hashes=False, sample_every=10)
+    dense = run_simulation(scenario.to_system_state(), scenario.events, dense_config).trajectory
+    sparse = run_simulation(scenario.to_system_state(), scenario.events, sparse_config).trajectory
+    assert len(sparse.times) == settings.steps // 10 + 1
+    assert sparse.times[-1] == dense.times[-1]
+
+    dense_times, dense_positions, _ = dense.as_arrays()
+    hermite = sample_trajectory_many(sparse, dense_times, method="hermite")
+    linear = sample_trajectory_many(sparse, dense_times, method="linear")
+    hermite_error = np.abs(hermite - dense_positions).max()
+    linear_error = np.abs(linear - dense_positions).max()
+    assert hermite_error < linear_error * 0.1
+    assert sample_trajectory(sparse, 1230.0, method="hermite") == hermite[123].tolist()
+
+
+def test_playback_cursor_matches_batch_interpolation() -> None:
+    scenario_path = (
+        Path(__file__).resolve().parents[1] / "examples" / "scenarios" / "two_body_orbit.json"
+    )
+    scenario = load_scenario(scenario_path)
+    config = scenario.settings.to_simulation_config(record_hashes=False, sample_every=10)
+    trajectory = run_simulation(scenario.to_system_state(), scenario.events, config).trajectory
+    query = np.array([0.0, 3.3, 45.0, 47.5, 1000.0, 12.0, 2500.0])
+    expected = sample_trajectory_many(trajectory, query, method="hermite")
+
+    cursor = PlaybackCursor(trajectory, method="hermite")
+    buffer = cursor.positions
+    for time_s, reference in zip(query, expected, strict=True):
+        result = cursor.seek(float(time_s))
+        assert result is buffer
+        assert np.allclose(result, reference)
+
+    nearest = PlaybackCursor(trajectory, method="nearest")
+    nearest.seek(160.0)
+    assert nearest.nearest_index() == 2
+    assert np.array_equal(nearest.positions, np.array(trajectory.positions[2]))
+
+
+def test_trajectory_arrays_are_cached_until_the_next_record() -> None:
+    trajectory = Trajectory(body_ids=["a"])
+    trajectory.record(0.0, np.zeros((1, 3)), np.zeros((1, 3)))
+    first = trajectory.as_arrays()
+    assert trajectory.as_arrays() is first
+    assert not first[1].flags.writeable
+
+    trajectory.record(1.0, np.ones((1, 3)), np.zeros((1, 3)))
+    times, positions, _ = trajectory.as_arrays()
+    assert times.tolist() == [0.0, 1.0]
+    assert positions[1, 0].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_sampling_entry_points_share_the_linear_default() -> None:
+    times = np.array([0.0, 1.0, 2.0])
+    positions = np.array([[[0.0, 0.0, 0.0]], [[1.0, 0.0, 0.0]], [[4.0, 0.0, 0.0]]])
+    velocities = np.array([[[0.0, 0.0, 0.0]], [[3.0, 0.0, 0.0]], [[3.0, 0.0, 0.0]]])
+    trajectory = Trajectory(body_ids=["a"])
+    for time_s, position, velocity in zip(times, positions, velocities, strict=True):
+        trajectory.record(time_s, position, velocity)
+
+    expected = [[[0.5, 0.0, 0.0]], [[2.5, 0.0, 0.0]]]
+    query = np.array([0.5, 1.5])
+    assert sample_trajectory_many(trajectory, query).tolist() == expected
+    assert interpolate_positions(times, positions, velocities, query).tolist() == expected
+    assert sample_trajectory(trajectory, 1.5) == expected[1]
+    assert PlaybackCursor(trajectory).seek(1.5).tolist() == expected[1]
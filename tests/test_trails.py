@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import numpy as np
+
+from physics_studio.core.run.lod import build_lod
+from physics_studio.render.trails import TrailLayer
+from physics_studio.scenario.models import CameraState
+
+
+def _spiral(samples: int = 200) -> tuple[np.ndarray, np.ndarray]:
+    times = np.linspace(0.0, 2.0, samples)
+    angle = times * 6.0
+    radius = 1.0 + times
+    positions = np.stack(
+        [radius * np.cos(angle), radius * np.sin(angle), np.zeros_like(times)], axis=1
+    )[:, None, :]
+    return times, positions
+
+
+def test_incremental_trail_matches_full_rebuild() -> None:
+    times, positions = _spiral()
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+
+    incremental = TrailLayer(160, 120, ["probe"], times, positions)
+    for time_s in np.linspace(0.0, 1.5, 40):
+        frame = incremental.render(camera, float(time_s))
+    fresh = TrailLayer(160, 120, ["probe"], times, positions).render(camera, 1.5)
+
+    assert frame.any()
+    assert np.array_equal(frame, fresh)
+
+    moved = CameraState(position=(0.5, 0.0, 10.0), target=(0.5, 0.0, 0.0), fov_deg=70.0)
+    rebuilt = incremental.render(moved, 1.5)
+    expected = TrailLayer(160, 120, ["probe"], times, positions).render(moved, 1.5)
+    assert np.array_equal(rebuilt, expected)
+    assert not np.array_equal(rebuilt, frame)
+
+
+def test_trail_length_limit_drops_old_segments() -> None:
+    times, positions = _spiral()
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+
+    full = TrailLayer(160, 120, ["probe"], times, positions).render(camera, 2.0)
+    limited = TrailLayer(160, 120, ["probe"], times, positions, max_age_s=0.25)
+    for time_s in (0.5, 1.0, 2.0):
+        frame = limited.render(camera, time_s)
+
+    assert frame.any()
+    assert np.count_nonzero(frame.any(axis=2)) < np.count_nonzero(full.any(axis=2))
+    assert not (frame.any(axis=2) & ~full.any(axis=2)).any()
+
+
+def test_lod_trail_does_not_depend_on_render_history() -> None:
+    times, positions = _spiral(4001)
+    lod = build_lod(times, positions)
+    assert len(lod.levels) == 6
+
+    def layer() -> TrailLayer:
+        return TrailLayer(160, 120, ["probe"], times, positions, lod=lod)
+
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+    incremental = layer()
+    for time_s in np.linspace(0.0, 1.5, 40):
+        frame = incremental.render(camera, float(time_s), positions[0] * 0.0)
+    fresh = layer().render(camera, 1.5, positions[0] * 0.0)
+    assert frame.any()
+    assert np.array_equal(frame, fresh)
+
+    moving = layer()
+    for index, time_s in enumerate(np.linspace(0.0, 1.5, 20)):
+        orbit = CameraState(position=(0.1 * index, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+        frame = moving.render(orbit, float(time_s))
+    assert np.array_equal(frame, layer().render(orbit, 1.5))
+
+
+def test_crossing_trails_do_not_depend_on_render_history() -> None:
+    times, spiral = _spiral()
+    positions = np.concatenate([spiral, spiral[:, :, [1, 0, 2]]], axis=1)
+    camera = CameraState(position=(0.0, 0.0, 10.0), target=(0.0, 0.0, 0.0), fov_deg=70.0)
+
+    incremental = TrailLayer(160, 120, ["a", "b"], times, positions)
+    for time_s in np.linspace(0.0, 2.0, 25):
+        frame = incremental.render(camera, float(time_s))
+    fresh = TrailLayer(160, 120, ["a", "b"], times, positions).render(camera, 2.0)
+    assert np.array_equal(frame, fresh)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from physics_studio.render.yuv import Yuv420Converter
+
+
+def _reference(rgb: np.ndarray) -> np.ndarray:
+    pixels = rgb.astype(np.int64)
+    r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    luma = ((66 * r + 129 * g + 25 * b + 128) >> 8) + 16
+    height, width, _ = rgb.shape
+    sub = pixels.reshape(height // 2, 2, width // 2, 2, 3).sum(axis=(1, 3))
+    sub = (sub + 2) // 4
+    r, g, b = sub[..., 0], sub[..., 1], sub[..., 2]
+    u = ((-38 * r - 74 * g + 112 * b + 128) >> 8) + 128
+    v = ((112 * r - 94 * g - 18 * b + 128) >> 8) + 128
+    return np.concatenate([luma.ravel(), u.ravel(), v.ravel()]).astype(np.uint8)
+
+
+def test_yuv420_matches_integer_reference_and_reuses_output() -> None:
+    rng = np.random.default_rng(5)
+    converter = Yuv420Converter(10, 6)
+    out = np.empty(10 * 6 * 3 // 2, dtype=np.uint8)
+    for _ in range(3):
+        rgb = rng.integers(0, 256, size=(6, 10, 3), dtype=np.uint8)
+        assert converter.convert(rgb, out) is out
+        assert np.array_equal(out, _reference(rgb))
+
+    with pytest.raises(ValueError):
+        Yuv420Converter(9, 6)